@@ -0,0 +1,156 @@
+# app/cache.py
+
+import abc
+import threading
+import time
+
+from collections import OrderedDict
+from app.config import CACHE_MAX_SIZE, CACHE_TTL, STATS_CACHE_TTL
+from typing import Any
+
+
+# returned by CacheBackend.get(), because None can be a cached value.
+MISSING = object()
+
+"""
+TODO: Define all cache backend BELOW!
+"""
+class CacheBackend(abc.ABC):
+    """Interface of a cache in front of the single entity resolvers.
+
+    A shared backend (e.g. Redis) can replace the local one with
+    use_cache_backend(), it only has to implement these methods.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the cached value of key, or MISSING."""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Cache value under key."""
+
+    @abc.abstractmethod
+    def delete(self, *keys: str) -> None:
+        """Drop the given keys, unknown keys are ignored."""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Drop every key."""
+
+    @abc.abstractmethod
+    def stats(self) -> dict:
+        """Return counters such as hits, misses and size."""
+
+# in-process LRU cache where every entry expires after `ttl` seconds.
+class LocalCache(CacheBackend):
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # resolvers run in worker threads in sync mode.
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+
+                self.misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits_total": self.hits,
+            "misses_total": self.misses,
+            "evictions_total": self.evictions,
+            "size": len(self._entries),
+        }
+
+"""
+TODO: Define all cache helper BELOW!
+"""
+entity_cache: CacheBackend = LocalCache(max_size=CACHE_MAX_SIZE, ttl=CACHE_TTL)
+# one entry per aggregate of app/stats.py.
+stats_cache = LocalCache(max_size=64, ttl=STATS_CACHE_TTL)
+# counts the writes, a result read before a write is not cached after it.
+stats_generation = 0
+# the same for the entity cache, bumped by invalidate_film() and invalidate_actor().
+entity_generation = 0
+
+def get_cache() -> CacheBackend:
+    return entity_cache
+
+# a row read before this changed is not cached, it may be older than the invalidation.
+def get_generation() -> int:
+    return entity_generation
+
+# swap the local cache for another backend, e.g. a shared one.
+def use_cache_backend(backend: CacheBackend) -> None:
+    global entity_cache
+    entity_cache = backend
+
+def film_key(title: str = None, uuid: str = None) -> str:
+    return f"film:uuid:{uuid}" if uuid is not None else f"film:title:{title}"
+
+def actor_key(name: str = None, uuid: str = None) -> str:
+    return f"actor:uuid:{uuid}" if uuid is not None else f"actor:name:{name}"
+
+# the caches are only invalidated in the worker that wrote, but an ETag is derived from the
+# catalog version every worker sees. what a GET request gets from a cache is keyed by that version.
+def versioned_key(key: str, request) -> str:
+    version = getattr(request.state, "catalog_version", None) if request is not None else None
+
+    return key if version is None else f"v{version}:{key}"
+
+# every write changes some aggregate, so all of them are dropped.
+def invalidate_stats() -> None:
+    global stats_generation
+    stats_generation += 1
+    stats_cache.clear()
+
+# used by the mutations after they wrote a film.
+def invalidate_film(title: str = None, uuid: str = None) -> None:
+    global entity_generation
+    entity_generation += 1
+    get_cache().delete(film_key(title=title), film_key(uuid=uuid))
+    invalidate_stats()
+
+# used by the mutations after they wrote an actor.
+def invalidate_actor(name: str = None, uuid: str = None) -> None:
+    global entity_generation
+    entity_generation += 1
+    get_cache().delete(actor_key(name=name), actor_key(uuid=uuid))
+    invalidate_stats()
@@ -5,7 +5,9 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from app.database.pool import TimedQueuePool, TimedAsyncAdaptedQueuePool
 
 
 """
@@ -16,15 +18,175 @@ load_dotenv()
 # just creating an engine!
 SQLALCHEMY_DATABASE_URL = os.environ.get("POSTGRES_DATABASE_URI")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# "sync" runs resolvers on psycopg2 sessions in worker threads,
+# "async" runs them on asyncpg through an AsyncSession.
+DATABASE_MODE = os.environ.get("DATABASE_MODE", "sync").lower()
 
-SessionLocal = sessionmaker(
-    autocommit=False, 
-    autoflush=False, 
-    bind=engine
+if DATABASE_MODE not in ("sync", "async"):
+    raise ValueError(f"DATABASE_MODE must be 'sync' or 'async', not '{DATABASE_MODE}'.")
+
+SQLALCHEMY_ASYNC_DATABASE_URL = os.environ.get(
+    "POSTGRES_ASYNC_DATABASE_URI",
+    (SQLALCHEMY_DATABASE_URL or "").replace("postgresql://", "postgresql+asyncpg://", 1)
+    )
+
+# read replicas of the queries, comma separated URLs like POSTGRES_DATABASE_URI,
+# mutations and everything outside of GraphQL queries always use the primary.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+DATABASE_REPLICA_CHECK_INTERVAL = float(os.environ.get("DATABASE_REPLICA_CHECK_INTERVAL", 5))
+# seconds a client reads from the primary after its own mutation, so it sees what it wrote.
+READ_YOUR_WRITES_WINDOW = float(os.environ.get("READ_YOUR_WRITES_WINDOW", 5))
+
+# connection pool, shared by the ORM sessions and app/database/sql_tool.py.
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", 5))
+DATABASE_MAX_OVERFLOW = int(os.environ.get("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_PRE_PING = os.environ.get("DATABASE_POOL_PRE_PING", "false").lower() == "true"
+DATABASE_POOL_RECYCLE = int(os.environ.get("DATABASE_POOL_RECYCLE", -1))
+DATABASE_POOL_TIMEOUT = float(os.environ.get("DATABASE_POOL_TIMEOUT", 30))
+
+pool_options = dict(
+    pool_size=DATABASE_POOL_SIZE,
+    max_overflow=DATABASE_MAX_OVERFLOW,
+    pool_pre_ping=DATABASE_POOL_PRE_PING,
+    pool_recycle=DATABASE_POOL_RECYCLE,
+    pool_timeout=DATABASE_POOL_TIMEOUT,
     )
+
+"""
+NOTE: the engines are created on first use, not at import time. Importing
+the app (e.g. to build the schema) never loads a driver or connects, and a
+worker forked from a parent that never touched the database starts with
+nothing to clean up.
+"""
+_engine = None
+_session_local = None
+_async_engine = None
+_async_session_local = None
+
+def get_engine():
+    global _engine
+
+    if _engine is None:
+        _engine = create_engine(
+            SQLALCHEMY_DATABASE_URL, 
+            poolclass=TimedQueuePool, 
+            **pool_options
+            )
+
+    return _engine
+
+def get_session_local() -> sessionmaker:
+    global _session_local
+
+    if _session_local is None:
+        _session_local = sessionmaker(
+            autocommit=False, 
+            autoflush=False, 
+            bind=get_engine()
+            )
+
+    return _session_local
+
+# the async engine only exists in async mode, asyncpg is not needed otherwise.
+def get_async_engine():
+    global _async_engine
+
+    if _async_engine is None and DATABASE_MODE == "async":
+        _async_engine = create_async_engine(
+            SQLALCHEMY_ASYNC_DATABASE_URL, 
+            poolclass=TimedAsyncAdaptedQueuePool, 
+            **pool_options
+            )
+
+    return _async_engine
+
+def get_async_session_local() -> async_sessionmaker:
+    global _async_session_local
+
+    if _async_session_local is None:
+        _async_session_local = async_sessionmaker(
+            autoflush=False,
+            bind=get_async_engine()
+            )
+
+    return _async_session_local
+
+# a worker must never use connections it inherited from the process that forked it,
+# close=False leaves them to the parent and gives the worker fresh, empty pools.
+def reset_engines() -> None:
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+async def dispose_engines() -> None:
+    if _engine is not None:
+        _engine.dispose()
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
 Base = declarative_base()
 
+# read-through cache for single film/actor lookups, a size of 0 turns it off.
+CACHE_MAX_SIZE = int(os.environ.get("CACHE_MAX_SIZE", 1024))
+CACHE_TTL = float(os.environ.get("CACHE_TTL", 60))
+# the aggregates of the stats query scan whole tables, every mutation drops them anyway.
+STATS_CACHE_TTL = float(os.environ.get("STATS_CACHE_TTL", 300))
+
+# the most items a bulk mutation accepts at once.
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 5000))
+
+# rows fetched per round trip by the server-side cursors of the exports.
+EXPORT_FETCH_SIZE = int(os.environ.get("EXPORT_FETCH_SIZE", 2000))
+
+# parsed documents and persisted queries kept per process, and the optional
+# manifest of allowed operations (see app/persisted_queries.py).
+PERSISTED_QUERIES_CACHE_SIZE = int(os.environ.get("PERSISTED_QUERIES_CACHE_SIZE", 1024))
+PERSISTED_QUERIES_ALLOWLIST = os.environ.get("PERSISTED_QUERIES_ALLOWLIST")
+
+# the most operations one batched request (a JSON array) may carry.
+GRAPHQL_MAX_BATCH_SIZE = int(os.environ.get("GRAPHQL_MAX_BATCH_SIZE", 20))
+
+# operations over the cost budget or deeper than the max depth are rejected (see app/cost.py),
+# lists without a limit/first/last argument are counted with the default list size.
+QUERY_COST_BUDGET = int(os.environ.get("QUERY_COST_BUDGET", 5000))
+QUERY_MAX_DEPTH = int(os.environ.get("QUERY_MAX_DEPTH", 10))
+QUERY_DEFAULT_LIST_SIZE = int(os.environ.get("QUERY_DEFAULT_LIST_SIZE", 10))
+
+# add the timing breakdown of every operation to its response (see app/tracing.py).
+TRACING_IN_RESPONSE = os.environ.get("TRACING_IN_RESPONSE", "false").lower() == "true"
+
+# how long clients and CDNs may reuse a GET response before they revalidate its ETag.
+HTTP_CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", 0))
+
+# changes a subscriber may fall behind before it is disconnected (see app/notifications.py).
+SUBSCRIPTION_QUEUE_SIZE = int(os.environ.get("SUBSCRIPTION_QUEUE_SIZE", 100))
+# seconds between attempts to reconnect the LISTEN connection of the subscriptions.
+SUBSCRIPTION_RECONNECT_INTERVAL = float(os.environ.get("SUBSCRIPTION_RECONNECT_INTERVAL", 1))
+
+# serve the combine queries from the film_casts/actor_filmographies read model (see app/read_model.py).
+READ_MODEL_ENABLED = os.environ.get("READ_MODEL_ENABLED", "false").lower() == "true"
+# seconds a document may lag behind its rows, an older one is skipped for the live join.
+READ_MODEL_MAX_STALENESS = float(os.environ.get("READ_MODEL_MAX_STALENESS", 5))
+READ_MODEL_REFRESH_INTERVAL = float(os.environ.get("READ_MODEL_REFRESH_INTERVAL", 1))
+READ_MODEL_REFRESH_BATCH_SIZE = int(os.environ.get("READ_MODEL_REFRESH_BATCH_SIZE", 500))
+
 # for running the API
-APP_DEV_HOST = os.environ.get("APP_DEV_HOST")
-APP_DEV_PORT = int(os.environ.get("APP_DEV_PORT"))
\ No newline at end of file
+APP_DEV_HOST = os.environ.get("APP_DEV_HOST", "127.0.0.1")
+APP_DEV_PORT = int(os.environ.get("APP_DEV_PORT", 8000))
+
+# for running the API in production (python main.py --production), every worker
+# is its own process with its own pools, so the database sees up to
+# APP_WORKERS * (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW) connections.
+APP_HOST = os.environ.get("APP_HOST", "0.0.0.0")
+APP_PORT = int(os.environ.get("APP_PORT", 8000))
+APP_WORKERS = int(os.environ.get("APP_WORKERS", os.cpu_count() or 1))
+APP_LOOP = os.environ.get("APP_LOOP", "uvloop")
+APP_HTTP = os.environ.get("APP_HTTP", "httptools")
+APP_KEEP_ALIVE = int(os.environ.get("APP_KEEP_ALIVE", 5))
+APP_BACKLOG = int(os.environ.get("APP_BACKLOG", 2048))
+APP_LIMIT_CONCURRENCY = int(os.environ["APP_LIMIT_CONCURRENCY"]) if os.environ.get("APP_LIMIT_CONCURRENCY") else None
+# seconds a stopping worker waits for the requests in flight.
+APP_GRACEFUL_TIMEOUT = int(os.environ.get("APP_GRACEFUL_TIMEOUT", 30))
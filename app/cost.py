@@ -0,0 +1,200 @@
+# app/cost.py
+
+"""Static cost and depth analysis of GraphQL operations.
+
+Before an operation is executed its cost is computed from the document
+alone: every field that returns an object costs 1 (or its entry in
+FIELD_COSTS), and everything selected below a list is multiplied by the
+`limit`, `first` or `last` argument of that list, or by
+QUERY_DEFAULT_LIST_SIZE when the list has no such argument (e.g. the
+actors of a film). The `first` or `last` of a connection only multiplies
+its edges, pageInfo and totalCount are counted once; without them it is
+one page of DEFAULT_PAGE_SIZE edges, like app/pagination.py returns it. Operations over QUERY_COST_BUDGET or deeper than
+QUERY_MAX_DEPTH are rejected without touching the database. The
+operations of a batch share one budget (see app/router.py).
+
+    { getFilms(limit: 20) { title actors { name films { title } } } }
+    -> getFilms 1 + 20 * (actors 1 + 10 * (films 1 + 10 * 0)) = 221
+"""
+
+from graphql import (
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    get_named_type,
+    is_composite_type,
+    is_list_type,
+    is_non_null_type,
+    parse,
+    validate,
+)
+from graphql.execution.values import get_argument_values
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import SchemaExtension
+from app.config import QUERY_COST_BUDGET, QUERY_MAX_DEPTH, QUERY_DEFAULT_LIST_SIZE
+from app.pagination import DEFAULT_PAGE_SIZE
+from typing import Optional
+
+
+# fields that do more work than one indexed lookup, by GraphQL field name.
+FIELD_COSTS = {
+    "searchFilms": 5,
+    "searchActors": 5,
+    # one COUNT(*) over the whole table.
+    "totalCount": 10,
+    # GROUP BY over whole tables when they are not cached (see app/stats.py).
+    "filmsPerGenre": 10,
+    "filmsPerLanguage": 10,
+    "filmsPerReleaseYear": 10,
+    "topActors": 10,
+    "averageCastSize": 10,
+}
+
+# arguments that bound the size of a list.
+SIZE_ARGUMENTS = ("limit", "first", "last")
+
+# lists whose size is already counted by the `first`/`last` of their connection.
+SIZED_BY_PARENT = ("edges",)
+
+"""
+TODO: Define all cost helper BELOW!
+"""
+def is_connection(named_type) -> bool:
+    return any(name in getattr(named_type, "fields", {}) for name in SIZED_BY_PARENT)
+
+# the amount of items a list field returns at most, page_size is the one of the enclosing connection.
+def list_size(field_name: str, field_type, arguments: dict, page_size: int = 1) -> int:
+    if field_name in SIZED_BY_PARENT:
+        return page_size
+
+    for name in SIZE_ARGUMENTS:
+        if arguments.get(name) is not None:
+            return max(arguments[name], 0)
+
+    # a connection without first or last still returns a page of edges.
+    if is_connection(get_named_type(field_type)):
+        return DEFAULT_PAGE_SIZE
+
+    if is_non_null_type(field_type):
+        field_type = field_type.of_type
+
+    return QUERY_DEFAULT_LIST_SIZE if is_list_type(field_type) else 1
+
+# returns the cost and depth of a selection set on parent_type.
+def selection_cost(
+    schema, parent_type, selection_set, fragments: dict, variables: dict, page_size: int = 1
+    ) -> tuple[int, int]:
+    cost, depth = 0, 0
+
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpreadNode):
+            fragment = fragments[selection.name.value]
+            child_cost, child_depth = selection_cost(
+                schema, schema.get_type(fragment.type_condition.name.value), fragment.selection_set,
+                fragments, variables, page_size
+                )
+        elif isinstance(selection, InlineFragmentNode):
+            fragment_type = schema.get_type(selection.type_condition.name.value) if selection.type_condition else parent_type
+            child_cost, child_depth = selection_cost(
+                schema, fragment_type, selection.selection_set, fragments, variables, page_size
+                )
+        elif isinstance(selection, FieldNode):
+            name = selection.name.value
+
+            # introspection (e.g. from GraphiQL) never reaches the database.
+            if name.startswith("__"):
+                continue
+
+            field = parent_type.fields[name]
+            field_type = get_named_type(field.type)
+            arguments = get_argument_values(field, selection, variables)
+            size = list_size(name, field.type, arguments, page_size)
+            # a connection is one object, only its edges are a page (pageInfo and totalCount are not).
+            edges_size, size = (size, 1) if is_connection(field_type) else (1, size)
+            child_cost, child_depth = 0, 0
+
+            if selection.selection_set is not None and is_composite_type(field_type):
+                child_cost, child_depth = selection_cost(
+                    schema, field_type, selection.selection_set, fragments, variables, edges_size
+                    )
+
+            own_cost = FIELD_COSTS.get(name, 1 if is_composite_type(field_type) else 0)
+            child_cost = own_cost + size * child_cost
+            child_depth += 1
+        else:
+            continue
+
+        cost += child_cost
+        depth = max(depth, child_depth)
+
+    return cost, depth
+
+def operation_cost(schema, document, operation_name: Optional[str], variables: Optional[dict]) -> tuple[int, int]:
+    operation = get_operation_ast(document, operation_name)
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+        }
+
+    return selection_cost(
+        schema, schema.get_root_type(operation.operation), operation.selection_set, fragments, variables or {}
+        )
+
+# the cost of a query text before it is executed, None when the execution would reject it anyway.
+def query_cost(schema, query: Optional[str], operation_name: Optional[str], variables: Optional[dict]) -> Optional[int]:
+    try:
+        document = parse(query)
+    except (GraphQLError, TypeError):
+        return None
+
+    if validate(schema, document) or get_operation_ast(document, operation_name) is None:
+        return None
+
+    try:
+        return operation_cost(schema, document, operation_name, variables)[0]
+    except GraphQLError:
+        return None
+
+"""
+TODO: Define all schema extension BELOW!
+"""
+class QueryCost(SchemaExtension):
+    """Reject operations over the cost budget and report the cost of the others."""
+
+    cost: Optional[int] = None
+    depth: Optional[int] = None
+
+    def on_execute(self):
+        context = self.execution_context
+
+        try:
+            self.cost, self.depth = operation_cost(
+                context.schema._schema, context.graphql_document, context.operation_name, context.variables
+                )
+        except GraphQLError:
+            # e.g. a missing variable, the execution reports it the usual way.
+            self.cost = self.depth = None
+
+        if self.cost is not None and (self.cost > QUERY_COST_BUDGET or self.depth > QUERY_MAX_DEPTH):
+            message = (
+                f"Query cost {self.cost} exceeds the budget of {QUERY_COST_BUDGET}."
+                if self.cost > QUERY_COST_BUDGET else
+                f"Query depth {self.depth} exceeds the maximum of {QUERY_MAX_DEPTH}."
+                )
+            # strawberry does not execute an operation that already has a result.
+            context.result = GraphQLExecutionResult(
+                data=None,
+                errors=[GraphQLError(message, extensions={"code": "QUERY_TOO_EXPENSIVE"})]
+                )
+
+        yield
+
+    def get_results(self) -> dict:
+        if self.cost is None:
+            return {}
+
+        return {"cost": {"requested": self.cost, "depth": self.depth, "budget": QUERY_COST_BUDGET}}
@@ -0,0 +1,195 @@
+# app/database/explain_check.py
+
+"""Fail when a resolver query would scan a whole big table.
+
+Seeds films, actors and filmactors with --rows rows each (inside one
+transaction that is rolled back at the end), runs ANALYZE, then EXPLAINs
+the statements of the resolvers, DataLoaders and mutations and exits with
+1 if any plan contains a sequential scan over a seeded table. The
+statements are built by the same helpers the resolvers call and compiled
+by SQLAlchemy, so the check sees what production sends. The aggregates of
+app/stats.py and totalCount read whole tables on purpose and are not
+checked. Run it after the migrations:
+
+    python -m app.database.explain_check --rows 100000
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import rich
+
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from app.config import get_engine
+from app.models import (
+    Film as film_model,
+    Actor as actor_model,
+    FilmActor as film_actor_model,
+    )
+from app.inputs import (
+    FilmDeleteFilter as film_delete_filter,
+    ActorDeleteFilter as actor_delete_filter,
+    FilmActorDeleteFilter as film_actor_delete_filter,
+    )
+from app.query import entity_statement, uuid_page_statement, film_actors_statement, combine_statement
+from app.mutation import filter_conditions, delete_statement, counting_links_statement
+from app.pagination import DEFAULT_PAGE_SIZE, page_statement, encode_cursor
+from app.search import search_statement
+from app.loaders import actors_by_film_statement, films_by_actor_statement
+from app.read_model import film_cast_statement, actor_filmography_statement
+
+
+# the read model tables get a row per seeded film and actor from the triggers of migration 7.
+SEEDED_TABLES = ("films", "actors", "filmactors", "film_casts", "actor_filmographies")
+
+SEED_STATEMENTS = (
+    """
+    INSERT INTO films (uuid, title, genre, language, release, is_premiere, timestamp)
+    SELECT md5('film' || i), 'explain-check film ' || i, 'genre ' || (i %% 20), 'language ' || (i %% 10),
+        DATE '2000-01-01' + (i %% 8000), i %% 2 = 0, TIMESTAMP '2020-01-01' + i * INTERVAL '1 second'
+    FROM generate_series(1, %(rows)s) AS i
+    """,
+    """
+    INSERT INTO actors (uuid, name, birth_date, biography, nationality, timestamp)
+    SELECT md5('actor' || i), 'explain-check actor ' || i, DATE '1950-01-01' + (i %% 20000),
+        repeat('biography ', 20), 'nationality ' || (i %% 50), TIMESTAMP '2020-01-01' + i * INTERVAL '1 second'
+    FROM generate_series(1, %(rows)s) AS i
+    """,
+    # three actors per film.
+    """
+    INSERT INTO filmactors (uuid, film_id, actor_id, timestamp)
+    SELECT md5('link' || i || '-' || j), md5('film' || i), md5('actor' || ((i * 7 + j * 13) %% %(rows)s + 1)),
+        TIMESTAMP '2020-01-01' + (i * 3 + j) * INTERVAL '1 second'
+    FROM generate_series(1, %(rows)s) AS i, generate_series(1, 3) AS j
+    """,
+)
+
+# the uuid the seed statements give to row i, e.g. seeded_uuid("film", 500).
+def seeded_uuid(prefix: str, i) -> str:
+    return hashlib.md5(f"{prefix}{i}".encode()).hexdigest()
+
+# the statements the resolvers, DataLoaders and mutations send, built by their own helpers with seeded values.
+def resolver_statements() -> dict:
+    films, actors, film_actors = film_model.__table__, actor_model.__table__, film_actor_model.__table__
+    film_id, actor_id = seeded_uuid("film", 500), seeded_uuid("actor", 500)
+    title, name = "explain-check film 500", "explain-check actor 500"
+    # the seed statements count one second per row from 2020-01-01.
+    film_timestamp = datetime(2020, 1, 1) + timedelta(seconds=1800)
+    link_timestamp = datetime(2020, 1, 1) + timedelta(seconds=600 * 3 + 1)
+
+    return {
+        "getFilm(title)": entity_statement(film_model, film_model.title, title),
+        "getFilm(filmId)": entity_statement(film_model, film_model.title, title, film_id),
+        "getActor(name)": entity_statement(actor_model, actor_model.name, name),
+        "getActor(actorId)": entity_statement(actor_model, actor_model.name, name, actor_id),
+        "getFilms(uuid, next)": uuid_page_statement(film_model, list(films.c), film_id, True, 10),
+        "getFilms(uuid)": uuid_page_statement(film_model, list(films.c), film_id, False, 10),
+        "getActors(uuid, next)": uuid_page_statement(actor_model, list(actors.c), actor_id, True, 10),
+        "getActors(uuid)": uuid_page_statement(actor_model, list(actors.c), actor_id, False, 10),
+        "getFilmActors(skip, limit)": film_actors_statement(list(film_actors.c), 0, 100),
+        "getFilmsConnection(sort: TIMESTAMP)": page_statement(
+            film_model, list(films.c), "timestamp", DEFAULT_PAGE_SIZE,
+            after=encode_cursor("timestamp", film_timestamp, seeded_uuid("film", 1800)),
+            ),
+        "getFilmsConnection(sort: TITLE)": page_statement(
+            film_model, list(films.c), "title", DEFAULT_PAGE_SIZE, after=encode_cursor("title", title, film_id),
+            ),
+        "getFilmsConnection(last, before)": page_statement(
+            film_model, list(films.c), "title", DEFAULT_PAGE_SIZE,
+            before=encode_cursor("title", title, film_id), backward=True,
+            ),
+        "getActorsConnection(sort: NAME)": page_statement(
+            actor_model, list(actors.c), "name", DEFAULT_PAGE_SIZE, after=encode_cursor("name", name, actor_id),
+            ),
+        "getFilmActorsConnection(sort: TIMESTAMP)": page_statement(
+            film_actor_model, list(film_actors.c), "timestamp", DEFAULT_PAGE_SIZE,
+            after=encode_cursor("timestamp", link_timestamp, seeded_uuid("link", "600-1")),
+            ),
+        "searchFilms": search_statement(film_model, list(films.c), film_model.title, "film 500", 10)[0],
+        "searchActors": search_statement(actor_model, list(actors.c), actor_model.name, "actor 500", 10)[0],
+        "FilmTypeBase.actors (DataLoader)": actors_by_film_statement([seeded_uuid("film", i) for i in (1, 2, 3)]),
+        "ActorTypeBase.films (DataLoader)": films_by_actor_statement([seeded_uuid("actor", i) for i in (1, 2, 3)]),
+        "getOneFilmCombineActors (read model)": film_cast_statement(title),
+        "getOneActorCombineFilms (read model)": actor_filmography_statement(name),
+        "getOneFilmCombineActors": combine_statement(film_model, film_model.actors, film_model.title, title),
+        "getOneActorCombineFilms": combine_statement(actor_model, actor_model.films, actor_model.name, name),
+        "deleteFilm": delete(films).where(films.c.uuid == film_id),
+        # what ON DELETE CASCADE runs for every deleted film or actor.
+        "deleteFilm (cascade)": delete(film_actors).where(film_actors.c.film_id == film_id),
+        "deleteActor (cascade)": delete(film_actors).where(film_actors.c.actor_id == actor_id),
+        "deleteFilms(ids)": counting_links_statement(
+            films, filter_conditions(film_delete_filter(ids=[film_id]), {"ids": films.c.uuid}), film_actors.c.film_id
+            ),
+        "deleteFilms(titles)": counting_links_statement(
+            films, filter_conditions(film_delete_filter(titles=[title]), {"titles": films.c.title}), film_actors.c.film_id
+            ),
+        "deleteActors(names)": counting_links_statement(
+            actors, filter_conditions(actor_delete_filter(names=[name]), {"names": actors.c.name}), film_actors.c.actor_id
+            ),
+        "disconnectFilmActors(filmIds)": delete_statement(
+            film_actors, filter_conditions(film_actor_delete_filter(film_ids=[film_id]), {"film_ids": film_actors.c.film_id})
+            ),
+        "disconnectFilmActors(actorIds)": delete_statement(
+            film_actors, filter_conditions(film_actor_delete_filter(actor_ids=[actor_id]), {"actor_ids": film_actors.c.actor_id})
+            ),
+    }
+
+# collect the relations that a plan reads with a sequential scan.
+def sequential_scans(plan: dict) -> list:
+    scans = []
+
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name", "").lower() in SEEDED_TABLES:
+        scans.append(plan["Relation Name"])
+
+    for child in plan.get("Plans", []):
+        scans.extend(sequential_scans(child))
+
+    return scans
+
+def check(rows: int) -> bool:
+    engine = get_engine()
+    connection = engine.raw_connection()
+    passed = True
+
+    try:
+        cursor = connection.cursor()
+
+        for statement in SEED_STATEMENTS:
+            cursor.execute(statement, {"rows": rows})
+
+        for table in SEEDED_TABLES:
+            cursor.execute(f"ANALYZE {table}")
+
+        for resolver, statement in resolver_statements().items():
+            # the IN (...) lists are rendered with one parameter per value, like at execution.
+            compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+            raw_plan = cursor.fetchone()[0]
+            plan = (json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan)[0]["Plan"]
+            scans = sequential_scans(plan)
+
+            if scans:
+                passed = False
+                rich.print(f":red_circle: [bold red]{resolver}[/bold red] scans {', '.join(scans)} sequentially")
+            else:
+                rich.print(f"[bold green]{resolver}[/bold green] :white_check_mark:")
+
+        cursor.close()
+    finally:
+        # the seeded rows never become visible to anybody else.
+        connection.rollback()
+        connection.close()
+
+    return passed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EXPLAIN every resolver query on seeded tables.")
+    parser.add_argument("--rows", type=int, default=100000, help="rows seeded into each table")
+    args = parser.parse_args()
+
+    sys.exit(0 if check(args.rows) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# app/database/exporter.py
+
+"""Export films, actors or the cast as JSONL/CSV with flat memory usage.
+
+Rows are read through a named (server-side) cursor, EXPORT_FETCH_SIZE rows
+per round trip, and written out as they arrive. Usage:
+
+    python -m app.database.exporter films --format jsonl > films.jsonl
+    python -m app.database.exporter cast --format csv --output cast.csv
+
+The same stream is served by GET /export/{kind} in main.py.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+
+from app.config import get_engine, EXPORT_FETCH_SIZE
+from typing import Iterator
+
+
+"""
+TODO: Define all export statement BELOW!
+"""
+EXPORTS = {
+    "films": """
+        SELECT uuid, title, genre, language, release, is_premiere, timestamp
+        FROM films
+        ORDER BY uuid
+    """,
+    "actors": """
+        SELECT uuid, name, birth_date, biography, nationality, timestamp
+        FROM actors
+        ORDER BY uuid
+    """,
+    "cast": """
+        SELECT filmactors.uuid, films.uuid AS film_id, films.title AS film_title,
+            actors.uuid AS actor_id, actors.name AS actor_name, filmactors.timestamp
+        FROM filmactors
+        JOIN films ON films.uuid = filmactors.film_id
+        JOIN actors ON actors.uuid = filmactors.actor_id
+        ORDER BY filmactors.uuid
+    """,
+}
+
+MEDIA_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+"""
+TODO: Define all streaming helper BELOW!
+"""
+# yield the column names first, then every row, through a server-side cursor.
+def stream_rows(kind: str) -> Iterator[tuple]:
+    connection = get_engine().raw_connection()
+
+    try:
+        cursor = connection.cursor(name=f"export_{kind}")
+        cursor.itersize = EXPORT_FETCH_SIZE
+        cursor.execute(EXPORTS[kind])
+
+        rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+        yield tuple(column.name for column in cursor.description)
+
+        while rows:
+            yield from rows
+            rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+
+        cursor.close()
+        connection.commit()
+    finally:
+        # also runs when a download is aborted, the connection goes back to the pool.
+        connection.close()
+
+# turn the rows of one export into JSONL or CSV lines.
+def export_lines(kind: str, file_format: str) -> Iterator[str]:
+    rows = stream_rows(kind)
+
+    try:
+        columns = next(rows)
+
+        if file_format == "jsonl":
+            for row in rows:
+                yield json.dumps(dict(zip(columns, row)), default=str) + "\n"
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+
+            # flush in chunks instead of one tiny string per row.
+            if buffer.tell() > 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+    finally:
+        rows.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export films, actors or the cast as JSONL/CSV.")
+    parser.add_argument("kind", choices=EXPORTS)
+    parser.add_argument("--format", choices=MEDIA_TYPES, default="jsonl")
+    parser.add_argument("--output", help="defaults to stdout")
+    args = parser.parse_args()
+
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+
+    try:
+        for line in export_lines(args.kind, args.format):
+            output.write(line)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# app/database/importer.py
+
+"""Import films, actors or cast links from big CSV/JSONL dumps.
+
+The file is streamed with COPY FROM STDIN into a temporary staging table,
+then upserted into the real table with one INSERT ... SELECT. Usage:
+
+    python -m app.database.importer films films.csv
+    python -m app.database.importer actors actors.jsonl
+    python -m app.database.importer cast cast.csv
+
+Cast rows have a film_title and an actor_name column, both are resolved
+to their UUIDs with one join in the database. Films are matched by title
+and actors without a uuid by name and birth_date, so an import can be
+run again.
+"""
+
+import argparse
+import csv
+import io
+import json
+import pathlib
+import time
+import rich
+
+from app.config import get_engine
+from typing import Iterable, Iterator
+
+
+"""
+TODO: Define all import statement BELOW!
+"""
+# every kind has its staging table, the columns read from the file and the upsert.
+IMPORTS = {
+    "films": {
+        "columns": ("uuid", "title", "genre", "language", "release", "is_premiere"),
+        "upsert": """
+            INSERT INTO films (uuid, title, genre, language, release, is_premiere, timestamp)
+            SELECT DISTINCT ON (title)
+                coalesce(uuid, replace(gen_random_uuid()::text, '-', '')),
+                title, genre, language,
+                coalesce(release::date, CURRENT_DATE),
+                coalesce(is_premiere::boolean, FALSE),
+                CURRENT_TIMESTAMP
+            FROM staging
+            ORDER BY title
+            ON CONFLICT (title) DO UPDATE SET
+                genre = EXCLUDED.genre,
+                language = EXCLUDED.language,
+                release = EXCLUDED.release,
+                is_premiere = EXCLUDED.is_premiere,
+                timestamp = EXCLUDED.timestamp
+        """,
+    },
+    "actors": {
+        "columns": ("uuid", "name", "birth_date", "biography", "nationality"),
+        # rows without a uuid are the actor with the same name and birth_date, or get a uuid
+        # derived from both, so importing the same file again updates instead of duplicating.
+        "upsert": """
+            INSERT INTO actors (uuid, name, birth_date, biography, nationality, timestamp)
+            SELECT DISTINCT ON (uuid)
+                uuid, name, birth_date, biography, nationality, CURRENT_TIMESTAMP
+            FROM (
+                SELECT coalesce(
+                        staging.uuid,
+                        (
+                            SELECT actors.uuid FROM actors
+                            WHERE actors.name = staging.name
+                                AND actors.birth_date IS NOT DISTINCT FROM staging.birth_date::date
+                            ORDER BY actors.uuid
+                            LIMIT 1
+                        ),
+                        md5(staging.name || '/' || coalesce(staging.birth_date::date::text, ''))
+                    ) AS uuid,
+                    staging.name, staging.birth_date::date AS birth_date, staging.biography, staging.nationality
+                FROM staging
+            ) AS rows
+            ON CONFLICT (uuid) DO UPDATE SET
+                name = EXCLUDED.name,
+                birth_date = EXCLUDED.birth_date,
+                biography = EXCLUDED.biography,
+                nationality = EXCLUDED.nationality,
+                timestamp = EXCLUDED.timestamp
+        """,
+    },
+    "cast": {
+        "columns": ("film_title", "actor_name"),
+        # actor names are not unique, the first actor with that name is linked.
+        "upsert": """
+            INSERT INTO filmactors (uuid, film_id, actor_id, timestamp)
+            SELECT replace(gen_random_uuid()::text, '-', ''), links.film_id, links.actor_id, CURRENT_TIMESTAMP
+            FROM (
+                SELECT DISTINCT ON (staging.film_title, staging.actor_name)
+                    films.uuid AS film_id, actors.uuid AS actor_id
+                FROM staging
+                JOIN films ON films.title = staging.film_title
+                JOIN actors ON actors.name = staging.actor_name
+                ORDER BY staging.film_title, staging.actor_name, actors.uuid
+            ) AS links
+            ON CONFLICT (film_id, actor_id) DO NOTHING
+        """,
+    },
+}
+
+"""
+TODO: Define all streaming helper BELOW!
+"""
+# read records one by one, so the memory does not grow with the file.
+def read_records(path: pathlib.Path, file_format: str) -> Iterator[dict]:
+    with path.open(newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+# file-like object that COPY FROM STDIN reads the records from as CSV.
+class CopyStream:
+    def __init__(self, records: Iterable[dict], columns: tuple) -> None:
+        self.columns = columns
+        self.rows = 0
+        self._records = iter(records)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._pending = ""
+
+    def _next_line(self) -> str:
+        record = next(self._records)
+        self._writer.writerow([record.get(column) for column in self.columns])
+        self.rows += 1
+
+        line = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+        return line
+
+    def read(self, size: int = -1) -> str:
+        chunks = [self._pending]
+        length = len(self._pending)
+
+        while size < 0 or length < size:
+            try:
+                line = self._next_line()
+            except StopIteration:
+                break
+
+            chunks.append(line)
+            length += len(line)
+
+        data = "".join(chunks)
+
+        if size < 0:
+            self._pending = ""
+            return data
+
+        self._pending = data[size:]
+        return data[:size]
+
+# used for importing one file, returns the amount of rows read and written.
+def import_file(kind: str, path: pathlib.Path, file_format: str) -> tuple[int, int]:
+    columns = IMPORTS[kind]["columns"]
+    stream = CopyStream(read_records(path, file_format), columns)
+    connection = get_engine().raw_connection()
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            f"CREATE TEMP TABLE staging ({', '.join(f'{column} TEXT' for column in columns)}) ON COMMIT DROP"
+            )
+        cursor.copy_expert(f"COPY staging ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream)
+        cursor.execute(IMPORTS[kind]["upsert"])
+        written = cursor.rowcount
+
+        # the triggers of migration 8 bump the catalog version with this commit.
+        connection.commit()
+        cursor.close()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    return stream.rows, written
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import films, actors or cast links with COPY.")
+    parser.add_argument("kind", choices=IMPORTS)
+    parser.add_argument("path", type=pathlib.Path)
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="defaults to the file extension")
+    args = parser.parse_args()
+
+    file_format = args.format or ("jsonl" if args.path.suffix in (".jsonl", ".json") else "csv")
+
+    started = time.perf_counter()
+    read, written = import_file(args.kind, args.path, file_format)
+    elapsed = time.perf_counter() - started
+
+    rich.print(f"[bold green]{args.kind}[/bold green]: {read} rows read, {written} rows written :white_check_mark:")
+    rich.print(f"[bold yellow]{read / elapsed if elapsed else 0:.0f}[/bold yellow] rows/sec in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+# app/database/migrations.py
+
+"""Versioned schema migrations.
+
+Every migration runs once, in its own transaction, and is recorded in the
+schema_migrations table. Usage:
+
+    python -m app.database.migrations            # apply pending migrations
+    python -m app.database.migrations --status   # list applied and pending
+"""
+
+import argparse
+import rich
+
+from app.config import get_engine
+from typing import NamedTuple
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    statements: tuple
+
+"""
+TODO: Define all migration BELOW!
+NOTE: never edit an applied migration, add a new one instead.
+"""
+MIGRATIONS = (
+    # the tables that used to be created from app/database/query.py,
+    # IF NOT EXISTS keeps this a no-op on databases created back then.
+    Migration(1, "create films, actors and filmactors", (
+        """
+        CREATE TABLE IF NOT EXISTS Films (
+            uuid VARCHAR(36) NOT NULL,
+            title VARCHAR(255) NOT NULL UNIQUE,
+            genre VARCHAR(255) NOT NULL,
+            language VARCHAR(255) NOT NULL,
+            release DATE NULL DEFAULT CURRENT_DATE,
+            is_premiere BOOLEAN DEFAULT FALSE,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (uuid)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Actors (
+            uuid VARCHAR(36) NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            birth_date DATE NULL DEFAULT CURRENT_DATE,
+            biography TEXT NULL,
+            nationality VARCHAR(255) NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (uuid)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS FilmActors (
+            uuid VARCHAR(36) NOT NULL,
+            film_id VARCHAR(36) NOT NULL,
+            actor_id VARCHAR(36) NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (uuid),
+            CONSTRAINT fk_film_actors FOREIGN KEY (film_id) REFERENCES films(uuid) ON DELETE CASCADE,
+            CONSTRAINT fk_actor_films FOREIGN KEY (actor_id) REFERENCES actors(uuid) ON DELETE CASCADE
+        )
+        """,
+    )),
+    # lookups by actor name and both sides of the join/cascade on filmactors.
+    # the unique (film_id, actor_id) index also serves every film_id lookup.
+    Migration(2, "lookup indexes and unique film actor links", (
+        "CREATE INDEX IF NOT EXISTS ix_actors_name_uuid ON actors (name, uuid)",
+        "CREATE INDEX IF NOT EXISTS ix_filmactors_actor_id ON filmactors (actor_id)",
+        """
+        DELETE FROM filmactors AS duplicate
+        USING filmactors AS original
+        WHERE duplicate.film_id = original.film_id
+            AND duplicate.actor_id = original.actor_id
+            AND duplicate.uuid > original.uuid
+        """,
+        "ALTER TABLE filmactors ADD CONSTRAINT uq_filmactors_film_id_actor_id UNIQUE (film_id, actor_id)",
+    )),
+    # keyset pagination compares (sort column, uuid), which needs non NULL sort columns.
+    Migration(3, "keyset pagination indexes", (
+        "UPDATE films SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL",
+        "UPDATE actors SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL",
+        "UPDATE filmactors SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL",
+        "ALTER TABLE films ALTER COLUMN timestamp SET NOT NULL",
+        "ALTER TABLE actors ALTER COLUMN timestamp SET NOT NULL",
+        "ALTER TABLE filmactors ALTER COLUMN timestamp SET NOT NULL",
+        "CREATE INDEX IF NOT EXISTS ix_films_timestamp_uuid ON films (timestamp, uuid)",
+        "CREATE INDEX IF NOT EXISTS ix_films_title_uuid ON films (title, uuid)",
+        "CREATE INDEX IF NOT EXISTS ix_actors_timestamp_uuid ON actors (timestamp, uuid)",
+        "CREATE INDEX IF NOT EXISTS ix_filmactors_timestamp_uuid ON filmactors (timestamp, uuid)",
+    )),
+    # ranked full-text search plus trigram matching for typos, used by searchFilms/searchActors.
+    # the 'simple' configuration does not stem, titles and names are in many languages.
+    Migration(4, "full-text and trigram search", (
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        """
+        ALTER TABLE films ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(genre, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(language, '')), 'C')
+        ) STORED
+        """,
+        """
+        ALTER TABLE actors ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(nationality, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(biography, '')), 'C')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_films_search_vector ON films USING gin (search_vector)",
+        "CREATE INDEX IF NOT EXISTS ix_actors_search_vector ON actors USING gin (search_vector)",
+        "CREATE INDEX IF NOT EXISTS ix_films_title_trgm ON films USING gin (title gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_actors_name_trgm ON actors USING gin (name gin_trgm_ops)",
+    )),
+    # bumped after every write, the ETags of GET requests are derived from it (see app/http_cache.py).
+    Migration(5, "catalog version for HTTP caching", (
+        "CREATE SEQUENCE IF NOT EXISTS catalog_version",
+    )),
+    # every committed change of a row is sent on the catalog_changes channel, the subscriptions listen to it.
+    # NOTIFY payloads must be shorter than 8000 bytes, a longer row is sent without its biography.
+    Migration(6, "notify catalog changes for subscriptions", (
+        """
+        CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+        DECLARE
+            payload jsonb;
+        BEGIN
+            payload := jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'operation', TG_OP,
+                'row', to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END) - 'search_vector'
+            );
+
+            IF octet_length(payload::text) >= 8000 THEN
+                payload := jsonb_set(payload, '{row,biography}', 'null');
+            END IF;
+
+            PERFORM pg_notify('catalog_changes', payload::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER films_notify_catalog_change
+            AFTER INSERT OR UPDATE OR DELETE ON films
+            FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+        """,
+        """
+        CREATE TRIGGER actors_notify_catalog_change
+            AFTER INSERT OR UPDATE OR DELETE ON actors
+            FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+        """,
+        """
+        CREATE TRIGGER filmactors_notify_catalog_change
+            AFTER INSERT OR UPDATE OR DELETE ON filmactors
+            FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+        """,
+    )),
+    # one JSONB document per film (with its cast) and per actor (with its films) for the combine queries.
+    # the triggers only mark documents stale in the writing transaction, app/read_model.py rebuilds them.
+    Migration(7, "film cast and actor filmography read model", (
+        """
+        CREATE TABLE IF NOT EXISTS film_casts (
+            film_id VARCHAR(36) NOT NULL REFERENCES films(uuid) ON DELETE CASCADE,
+            title VARCHAR(255) NOT NULL,
+            document JSONB NULL,
+            stale_since TIMESTAMPTZ NULL,
+            refreshed_at TIMESTAMPTZ NULL,
+            PRIMARY KEY (film_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS actor_filmographies (
+            actor_id VARCHAR(36) NOT NULL REFERENCES actors(uuid) ON DELETE CASCADE,
+            name VARCHAR(255) NOT NULL,
+            document JSONB NULL,
+            stale_since TIMESTAMPTZ NULL,
+            refreshed_at TIMESTAMPTZ NULL,
+            PRIMARY KEY (actor_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_film_casts_title ON film_casts (title)",
+        "CREATE INDEX IF NOT EXISTS ix_actor_filmographies_name ON actor_filmographies (name)",
+        "CREATE INDEX IF NOT EXISTS ix_film_casts_stale_since ON film_casts (stale_since) WHERE stale_since IS NOT NULL",
+        """
+        CREATE INDEX IF NOT EXISTS ix_actor_filmographies_stale_since
+            ON actor_filmographies (stale_since) WHERE stale_since IS NOT NULL
+        """,
+        # the existing rows start out stale, the refresher fills them in batches.
+        "INSERT INTO film_casts (film_id, title, stale_since) SELECT uuid, title, now() FROM films",
+        "INSERT INTO actor_filmographies (actor_id, name, stale_since) SELECT uuid, name, now() FROM actors",
+        # the title and name stay current, they are the lookup keys; the documents follow later.
+        # a deleted film or actor is removed by ON DELETE CASCADE, its links by the filmactors trigger.
+        """
+        CREATE OR REPLACE FUNCTION mark_read_models_stale() RETURNS trigger AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'films' THEN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO film_casts (film_id, title, stale_since) VALUES (NEW.uuid, NEW.title, now());
+                ELSIF TG_OP = 'UPDATE' THEN
+                    UPDATE film_casts SET title = NEW.title, stale_since = coalesce(stale_since, now())
+                    WHERE film_id = NEW.uuid;
+
+                    UPDATE actor_filmographies SET stale_since = coalesce(stale_since, now())
+                    WHERE actor_id IN (SELECT actor_id FROM filmactors WHERE film_id = NEW.uuid);
+                END IF;
+            ELSIF TG_TABLE_NAME = 'actors' THEN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO actor_filmographies (actor_id, name, stale_since) VALUES (NEW.uuid, NEW.name, now());
+                ELSIF TG_OP = 'UPDATE' THEN
+                    UPDATE actor_filmographies SET name = NEW.name, stale_since = coalesce(stale_since, now())
+                    WHERE actor_id = NEW.uuid;
+
+                    UPDATE film_casts SET stale_since = coalesce(stale_since, now())
+                    WHERE film_id IN (SELECT film_id FROM filmactors WHERE actor_id = NEW.uuid);
+                END IF;
+            ELSE
+                IF TG_OP <> 'INSERT' THEN
+                    UPDATE film_casts SET stale_since = coalesce(stale_since, now()) WHERE film_id = OLD.film_id;
+                    UPDATE actor_filmographies SET stale_since = coalesce(stale_since, now()) WHERE actor_id = OLD.actor_id;
+                END IF;
+
+                IF TG_OP <> 'DELETE' THEN
+                    UPDATE film_casts SET stale_since = coalesce(stale_since, now()) WHERE film_id = NEW.film_id;
+                    UPDATE actor_filmographies SET stale_since = coalesce(stale_since, now()) WHERE actor_id = NEW.actor_id;
+                END IF;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER films_mark_read_models_stale
+            AFTER INSERT OR UPDATE ON films
+            FOR EACH ROW EXECUTE FUNCTION mark_read_models_stale()
+        """,
+        """
+        CREATE TRIGGER actors_mark_read_models_stale
+            AFTER INSERT OR UPDATE ON actors
+            FOR EACH ROW EXECUTE FUNCTION mark_read_models_stale()
+        """,
+        """
+        CREATE TRIGGER filmactors_mark_read_models_stale
+            AFTER INSERT OR UPDATE OR DELETE ON filmactors
+            FOR EACH ROW EXECUTE FUNCTION mark_read_models_stale()
+        """,
+    )),
+    # the version now changes in the transaction of the write, it becomes visible with the data it
+    # describes and a failed bump rolls the write back. the triggers are deferred to the commit,
+    # so the row of catalog_state is only locked while a writer commits, and bumped once per
+    # transaction however many rows it wrote.
+    Migration(8, "bump the catalog version in the writing transaction", (
+        """
+        CREATE TABLE IF NOT EXISTS catalog_state (
+            id BOOLEAN NOT NULL DEFAULT TRUE CHECK (id),
+            version BIGINT NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        "INSERT INTO catalog_state (version) SELECT last_value FROM catalog_version ON CONFLICT (id) DO NOTHING",
+        "DROP SEQUENCE IF EXISTS catalog_version",
+        """
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            IF coalesce(current_setting('catalog.version_bumped', true), '') <> 'on' THEN
+                PERFORM set_config('catalog.version_bumped', 'on', true);
+                UPDATE catalog_state SET version = version + 1;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE CONSTRAINT TRIGGER films_bump_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE ON films
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION bump_catalog_version()
+        """,
+        """
+        CREATE CONSTRAINT TRIGGER actors_bump_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE ON actors
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION bump_catalog_version()
+        """,
+        """
+        CREATE CONSTRAINT TRIGGER filmactors_bump_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE ON filmactors
+            DEFERRABLE INITIALLY DEFERRED
+            FOR EACH ROW EXECUTE FUNCTION bump_catalog_version()
+        """,
+    )),
+    # written by the read model refresher every round, so the replicas replay a commit of the
+    # primary at least that often and can tell how stale a document is by the clock of the primary.
+    Migration(9, "heartbeat of the read model refresher", (
+        """
+        CREATE TABLE IF NOT EXISTS read_model_heartbeat (
+            id BOOLEAN NOT NULL DEFAULT TRUE CHECK (id),
+            beat_at TIMESTAMPTZ NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        "INSERT INTO read_model_heartbeat (beat_at) VALUES (now()) ON CONFLICT (id) DO NOTHING",
+    )),
+)
+
+"""
+TODO: Define all migration helper BELOW!
+"""
+# any number works, it only has to be the same for every worker.
+MIGRATION_LOCK_ID = 741_852_963
+
+def applied_versions(cursor) -> set:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+
+    return {version for (version,) in cursor.fetchall()}
+
+# apply every pending migration, returns the versions that were applied.
+def migrate() -> list:
+    connection = get_engine().raw_connection()
+    applied = []
+
+    try:
+        cursor = connection.cursor()
+        # workers starting at the same time wait here instead of racing.
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+
+        try:
+            done = applied_versions(cursor)
+            connection.commit()
+
+            for migration in MIGRATIONS:
+                if migration.version in done:
+                    continue
+
+                for statement in migration.statements:
+                    cursor.execute(statement)
+
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (migration.version, migration.name)
+                    )
+                connection.commit()
+                applied.append(migration.version)
+
+                rich.print(f"[bold green]Migration {migration.version}[/bold green] {migration.name} :white_check_mark:")
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            connection.commit()
+            cursor.close()
+    finally:
+        connection.close()
+
+    return applied
+
+def status() -> None:
+    connection = get_engine().raw_connection()
+
+    try:
+        cursor = connection.cursor()
+        done = applied_versions(cursor)
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+    for migration in MIGRATIONS:
+        state = "[bold green]applied[/bold green]" if migration.version in done else "[bold yellow]pending[/bold yellow]"
+        rich.print(f"{migration.version:>4} {state} {migration.name}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply the schema migrations.")
+    parser.add_argument("--status", action="store_true", help="only list applied and pending migrations")
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+    elif not migrate():
+        rich.print("[bold green]Nothing to migrate[/bold green] :white_check_mark:")
+
+if __name__ == "__main__":
+    main()
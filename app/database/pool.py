@@ -0,0 +1,68 @@
+# app/database/pool.py
+
+import time
+
+from sqlalchemy.exc import TimeoutError as pool_timeout_error
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+# used for collecting how long checkouts wait for a free connection.
+class PoolWaitStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.timeouts = 0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+"""
+NOTE: every pool has stats of its own, so the primary and each replica are
+reported apart. SQLAlchemy recreates a pool through recreate() (e.g. after
+a disconnect), the new pool carries the stats of the old one on.
+"""
+class TimedPool:
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+
+        try:
+            return super()._do_get()
+        except pool_timeout_error:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            self.wait_stats.record(time.perf_counter() - started)
+
+class TimedQueuePool(TimedPool, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+# current state of a pool created with one of the classes above.
+def pool_status(pool) -> dict:
+    stats = pool.wait_stats
+
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "waits_total": stats.count,
+        "wait_seconds_total": stats.total_seconds,
+        "wait_seconds_max": stats.max_seconds,
+        "timeouts_total": stats.timeouts,
+    }
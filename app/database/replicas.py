@@ -0,0 +1,217 @@
+# app/database/replicas.py
+
+"""Route the reads of GraphQL queries to read replicas.
+
+Queries take a session from the next healthy replica (round-robin),
+mutations and everything outside of a GraphQL query use the primary. A
+background task pings the replicas every DATABASE_REPLICA_CHECK_INTERVAL
+seconds, and a replica that fails a read is skipped until it answers
+again. After a mutation the client gets a cookie, and for
+READ_YOUR_WRITES_WINDOW seconds its queries read from the primary, so
+it never misses its own writes because of replication lag.
+
+Queries sent with GET are tagged with the catalog version of the primary
+(see app/router.py), so they only read from a replica that has caught up
+to that version. The health check records the version of every replica,
+right after a write the GET requests use the primary until the next check
+has seen the write on a replica.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import math
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+from app.config import (
+    DATABASE_MODE,
+    DATABASE_REPLICA_URLS,
+    DATABASE_REPLICA_CHECK_INTERVAL,
+    READ_YOUR_WRITES_WINDOW,
+    pool_options,
+    )
+from app.database.pool import TimedQueuePool, TimedAsyncAdaptedQueuePool
+from app.http_cache import read_catalog_version
+from typing import Optional
+
+
+LAST_WRITE_COOKIE = "films_api_last_write"
+
+# True outside of GraphQL queries, so the CLIs and the mutations never read from a replica.
+use_primary: contextvars.ContextVar[bool] = contextvars.ContextVar("use_primary", default=True)
+# the catalog version the data of a GET request must have, None for every other read.
+required_version: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("required_version", default=None)
+
+"""
+TODO: Define all replica BELOW!
+"""
+class Replica:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.healthy = True
+        # the catalog version seen by the last health check, the replica has at least this one.
+        self.catalog_version = 0
+        self.engine = None
+        self.session_local = None
+
+    # the engine is created on first use, like the one of the primary.
+    def get_session_local(self):
+        if self.session_local is None:
+            if DATABASE_MODE == "async":
+                self.engine = create_async_engine(
+                    self.url.replace("postgresql://", "postgresql+asyncpg://", 1),
+                    poolclass=TimedAsyncAdaptedQueuePool,
+                    **pool_options
+                    )
+                self.session_local = async_sessionmaker(autoflush=False, bind=self.engine)
+            else:
+                self.engine = create_engine(self.url, poolclass=TimedQueuePool, **pool_options)
+                self.session_local = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        return self.session_local
+
+    async def ping(self) -> None:
+        self.get_session_local()
+
+        if DATABASE_MODE == "async":
+            async with self.engine.connect() as connection:
+                self.catalog_version = await connection.run_sync(read_catalog_version)
+        else:
+            def run() -> int:
+                with self.engine.connect() as connection:
+                    return read_catalog_version(connection)
+
+            self.catalog_version = await asyncio.to_thread(run)
+
+replicas = [Replica(url) for url in DATABASE_REPLICA_URLS]
+round_robin = itertools.count()
+
+# session factory of the next healthy replica, None when the primary has to be used.
+def replica_session_local():
+    if use_primary.get():
+        return None
+
+    version = required_version.get()
+    healthy = [
+        replica for replica in replicas
+        if replica.healthy and (version is None or replica.catalog_version >= version)
+        ]
+
+    if not healthy:
+        return None
+
+    return healthy[next(round_robin) % len(healthy)].get_session_local()
+
+# used before caching a row, a replica can lag behind the primary.
+# a GET only reads replicas that caught up to its version, so its rows are never older than their key.
+def lagging_read(session) -> bool:
+    return required_version.get() is None and from_replica(session)
+
+def from_replica(session) -> bool:
+    bind = session.get_bind()
+
+    return any(
+        bind in (replica.engine, getattr(replica.engine, "sync_engine", None))
+        for replica in replicas if replica.engine is not None
+        )
+
+def mark_unhealthy(session_local) -> None:
+    for replica in replicas:
+        if replica.session_local is session_local:
+            replica.healthy = False
+
+"""
+TODO: Define all health check BELOW!
+"""
+async def check_replicas() -> None:
+    for replica in replicas:
+        try:
+            await asyncio.wait_for(replica.ping(), timeout=DATABASE_REPLICA_CHECK_INTERVAL)
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+
+# started by the lifespan of main.py, runs until it is cancelled.
+async def monitor_replicas() -> None:
+    while True:
+        await check_replicas()
+        await asyncio.sleep(DATABASE_REPLICA_CHECK_INTERVAL)
+
+def get_replica_engines() -> list:
+    for replica in replicas:
+        replica.get_session_local()
+
+    return [replica.engine for replica in replicas]
+
+# the same as reset_engines() and dispose_engines() of app/config.py.
+def reset_replicas() -> None:
+    for replica in replicas:
+        if replica.engine is not None:
+            (replica.engine.sync_engine if DATABASE_MODE == "async" else replica.engine).dispose(close=False)
+
+async def dispose_replicas() -> None:
+    for replica in replicas:
+        if replica.engine is None:
+            continue
+
+        if DATABASE_MODE == "async":
+            await replica.engine.dispose()
+        else:
+            replica.engine.dispose()
+
+"""
+TODO: Define all read-your-writes helper BELOW!
+"""
+def wrote_recently(request) -> bool:
+    # e.g. an earlier mutation of the same batch.
+    if getattr(request.state, "wrote", False):
+        return True
+
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+
+    return time.time() - last_write < READ_YOUR_WRITES_WINDOW
+
+# set by app/router.py for GET requests, their ETag is derived from it.
+def request_version(request) -> Optional[int]:
+    return getattr(request.state, "catalog_version", None) if request is not None else None
+
+# used by the router after a mutation.
+def remember_write(response) -> None:
+    response.set_cookie(
+        LAST_WRITE_COOKIE,
+        str(time.time()),
+        max_age=math.ceil(READ_YOUR_WRITES_WINDOW),
+        httponly=True,
+        samesite="lax"
+        )
+
+"""
+TODO: Define all schema extension BELOW!
+"""
+class ReplicaRouting(SchemaExtension):
+    """Let the resolvers of a query read from the replicas."""
+
+    def on_execute(self):
+        context = self.execution_context
+        request = context.context.get("request") if isinstance(context.context, dict) else None
+        is_query = context.operation_type == OperationType.QUERY
+
+        token = use_primary.set(not replicas or not is_query or (request is not None and wrote_recently(request)))
+        version_token = required_version.set(request_version(request))
+
+        try:
+            yield
+        finally:
+            use_primary.reset(token)
+            required_version.reset(version_token)
+
+        if context.operation_type == OperationType.MUTATION and request is not None:
+            request.state.wrote = True
@@ -0,0 +1,46 @@
+# app/database/session.py
+
+import asyncio
+
+from sqlalchemy.exc import OperationalError
+from app.config import (
+    DATABASE_MODE,
+    get_session_local,
+    get_async_session_local,
+    )
+from app.database.replicas import replica_session_local, mark_unhealthy
+from typing import Any, Callable
+
+
+# used for running database work with the configured DATABASE_MODE.
+async def run_in_session(function: Callable[..., Any], *args: Any) -> Any:
+    """Call `function(session, *args)` and return its result.
+
+    In async mode the function gets the sync facade of an AsyncSession,
+    so the same ORM code runs on asyncpg without blocking the event loop.
+    In sync mode it gets a regular Session inside a worker thread.
+    The resolvers of GraphQL queries get a session of a read replica.
+    """
+    replica = replica_session_local()
+
+    if replica is not None:
+        try:
+            return await run_with(replica, function, *args)
+        except OperationalError:
+            # the replica went away since the last health check, queries only read so they can be retried.
+            mark_unhealthy(replica)
+
+    return await run_with(
+        get_async_session_local() if DATABASE_MODE == "async" else get_session_local(), function, *args
+        )
+
+async def run_with(session_local, function: Callable[..., Any], *args: Any) -> Any:
+    if DATABASE_MODE == "async":
+        async with session_local() as session:
+            return await session.run_sync(function, *args)
+
+    def run() -> Any:
+        with session_local() as session:
+            return function(session, *args)
+
+    return await asyncio.to_thread(run)
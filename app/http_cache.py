@@ -0,0 +1,40 @@
+# app/http_cache.py
+
+"""ETags for GraphQL queries sent with GET.
+
+Every transaction that writes films, actors or filmactors bumps the
+version in catalog_state when it commits (triggers of migration 8), the
+ETag of a GET request is a hash of that version and the request itself.
+As long as nothing was written, the same request gets the same ETag and
+a client (or CDN) that sends it back in If-None-Match gets a 304 without
+any resolver running.
+"""
+
+import hashlib
+import json
+
+from sqlalchemy import text
+from app.config import HTTP_CACHE_MAX_AGE
+from typing import Mapping
+
+
+CACHE_CONTROL = f"public, max-age={HTTP_CACHE_MAX_AGE}"
+
+"""
+TODO: Define all catalog version helper BELOW!
+"""
+# the writes bump it themselves, a reader sees the new version together with the new data.
+def read_catalog_version(session) -> int:
+    return session.execute(text("SELECT version FROM catalog_state")).scalar_one()
+
+# strong ETag of a GET request, the parameters are sorted so their order does not matter.
+def request_etag(version: int, params: Mapping[str, str]) -> str:
+    request_hash = hashlib.sha256(json.dumps(sorted(params.items())).encode("utf-8")).hexdigest()
+
+    return f'"{version}-{request_hash[:32]}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+
+    # W/ is how proxies mark a tag they re-encoded, the content is still the same.
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
@@ -3,7 +3,7 @@
 import strawberry
 
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
 """
 TODO: DEFINE ALL FILM INPUT BELOW!
@@ -42,24 +42,27 @@ class FilmCreateInput:
     however, the UUID field is not included""")
 class FilmUpdateInput:
     title: Optional[str] = strawberry.field(
+        default=strawberry.UNSET,
         description="Title of film data\nNOTE: max length is 255"
         )
     genre: Optional[str] = strawberry.field(
+        default=strawberry.UNSET,
         description="Genre of film data\nNOTE: max length is 255"
         )
     language: Optional[str] = strawberry.field(
+        default=strawberry.UNSET,
         description="The language options provided by a film\nNOTE: max length is 255"
         )
     release: Optional[date] = strawberry.field(
-        default=date.today(),
+        default=strawberry.UNSET,
         description="The release date of a film"
         )
     is_premiere: Optional[bool] = strawberry.field(
-        default=False, 
+        default=strawberry.UNSET,
         description="Ensure if the film is already premiered or not."
         )
     timestamp: Optional[datetime] = strawberry.field(
-        default=datetime.utcnow(),
+        default=strawberry.UNSET,
         description="Datetime of film data changes", 
         )
     
@@ -97,20 +100,23 @@ class ActorCreateInput:
     )
 class ActorUpdateInput:
     name: Optional[str] = strawberry.field(
+        default=strawberry.UNSET,
         description="Name of the actor or actress.\nNOTE: max length is 255"
         )
     birth_date: Optional[date] = strawberry.field(
-        default=date.today(),
+        default=strawberry.UNSET,
         description="Birthdate of the actor or actress",
         )
     biography: Optional[str] = strawberry.field(
+        default=strawberry.UNSET,
         description="Biography of the actor or actress"
         )
     nationality: Optional[str] = strawberry.field(
+        default=strawberry.UNSET,
         description="Nationality of the actor or actress.\nNOTE: max length is 255"
         )
     timestamp: Optional[datetime] = strawberry.field(
-        default=datetime.utcnow(),
+        default=strawberry.UNSET,
         description="Datetime of actor data changes.",
         )
 
@@ -130,3 +136,64 @@ class FilmActorInput:
         default=datetime.utcnow(),
         description="Datetime of film actors data changes.",
         )
+
+"""
+TODO: DEFINE ALL DELETE FILTER INPUT BELOW!
+"""
+@strawberry.input(
+    description="""Selects the films to delete, every given field must match.\n\
+    NOTE: at least one field is required, so nothing is deleted by accident."""
+    )
+class FilmDeleteFilter:
+    ids: Optional[List[str]] = strawberry.field(
+        default=None,
+        description="UUIDs of the films"
+        )
+    titles: Optional[List[str]] = strawberry.field(
+        default=None,
+        description="Titles of the films"
+        )
+    genre: Optional[str] = strawberry.field(
+        default=None,
+        description="Genre of the films"
+        )
+    language: Optional[str] = strawberry.field(
+        default=None,
+        description="Language of the films"
+        )
+
+@strawberry.input(
+    description="""Selects the actors to delete, every given field must match.\n\
+    NOTE: at least one field is required, so nothing is deleted by accident."""
+    )
+class ActorDeleteFilter:
+    ids: Optional[List[str]] = strawberry.field(
+        default=None,
+        description="UUIDs of the actors"
+        )
+    names: Optional[List[str]] = strawberry.field(
+        default=None,
+        description="Names of the actors"
+        )
+    nationality: Optional[str] = strawberry.field(
+        default=None,
+        description="Nationality of the actors"
+        )
+
+@strawberry.input(
+    description="""Selects the connections between Films and Actors to delete, every given field must match.\n\
+    NOTE: at least one field is required, e.g. only actorIds for all links of those actors."""
+    )
+class FilmActorDeleteFilter:
+    ids: Optional[List[str]] = strawberry.field(
+        default=None,
+        description="UUIDs from FilmActors table"
+        )
+    film_ids: Optional[List[str]] = strawberry.field(
+        default=None,
+        description="Identifiers from Film table"
+        )
+    actor_ids: Optional[List[str]] = strawberry.field(
+        default=None,
+        description="Identifiers from Actor table"
+        )
@@ -0,0 +1,79 @@
+# app/loaders.py
+
+from collections import defaultdict
+from strawberry.dataloader import DataLoader
+from app.models import (
+    Film as film_model,
+    Actor as actor_model,
+    FilmActor as film_actor_model,
+    )
+from app.types import (
+    FilmTypeBase as film_type_base,
+    ActorTypeBase as actor_type_base,
+    )
+from app.database.session import run_in_session
+from app.projection import map_rows
+from sqlalchemy import select
+from typing import List
+
+
+"""
+TODO: Define all batch statement BELOW!
+"""
+# the actors of many films with one IN (...) query against filmactors.
+def actors_by_film_statement(film_ids: List[str]):
+    return (
+        select(film_actor_model.film_id, *actor_model.__table__.columns)
+        .join_from(film_actor_model, actor_model, actor_model.uuid == film_actor_model.actor_id)
+        .where(film_actor_model.film_id.in_(film_ids))
+        )
+
+# the films of many actors with one IN (...) query against filmactors.
+def films_by_actor_statement(actor_ids: List[str]):
+    return (
+        select(film_actor_model.actor_id, *film_model.__table__.columns)
+        .join_from(film_actor_model, film_model, film_model.uuid == film_actor_model.film_id)
+        .where(film_actor_model.actor_id.in_(actor_ids))
+        )
+
+"""
+TODO: Define all batch load function BELOW!
+"""
+# fetch the actors of many films with one IN (...) query against filmactors.
+def load_actors_by_film_ids(session, film_ids: List[str]) -> List[List[actor_type_base]]:
+    actors_by_film = defaultdict(list)
+
+    rows = session.execute(actors_by_film_statement(film_ids)).all()
+
+    for row, actor in zip(rows, map_rows(actor_type_base, rows)):
+        actors_by_film[row.film_id].append(actor)
+
+    # DataLoader expects the results in the same order as the keys.
+    return [actors_by_film[film_id] for film_id in film_ids]
+
+# fetch the films of many actors with one IN (...) query against filmactors.
+def load_films_by_actor_ids(session, actor_ids: List[str]) -> List[List[film_type_base]]:
+    films_by_actor = defaultdict(list)
+
+    rows = session.execute(films_by_actor_statement(actor_ids)).all()
+
+    for row, film in zip(rows, map_rows(film_type_base, rows)):
+        films_by_actor[row.actor_id].append(film)
+
+    return [films_by_actor[actor_id] for actor_id in actor_ids]
+
+"""
+TODO: Define all DataLoader BELOW!
+"""
+async def batch_actors_by_film(film_ids: List[str]) -> List[List[actor_type_base]]:
+    return await run_in_session(load_actors_by_film_ids, list(film_ids))
+
+async def batch_films_by_actor(actor_ids: List[str]) -> List[List[film_type_base]]:
+    return await run_in_session(load_films_by_actor_ids, list(actor_ids))
+
+# must be called once per request, so the DataLoader cache never leaks between clients.
+def get_loaders() -> dict:
+    return {
+        "actors_by_film_loader": DataLoader(load_fn=batch_actors_by_film),
+        "films_by_actor_loader": DataLoader(load_fn=batch_films_by_actor),
+    }
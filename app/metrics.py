@@ -0,0 +1,59 @@
+# app/metrics.py
+
+from app.config import get_engine, get_async_engine
+from app.database.pool import pool_status
+from app.cache import get_cache, stats_cache
+from app.persisted_queries import document_cache
+from app.tracing import HISTOGRAMS
+from app.database.replicas import replicas
+from app.notifications import TABLES, change_hub
+
+
+# render the metrics in the Prometheus text exposition format.
+def render_metrics() -> str:
+    engine, async_engine = get_engine(), get_async_engine()
+    pools = {"sync": engine.pool}
+
+    if async_engine is not None:
+        pools["async"] = async_engine.pool
+
+    # only the replicas that were used so far have an engine.
+    for index, replica in enumerate(replicas):
+        if replica.engine is not None:
+            pools[f"replica{index}"] = replica.engine.pool
+
+    lines = []
+    for name in pool_status(engine.pool):
+        metric = f"films_api_pool_{name}"
+        lines.append(f"# TYPE {metric} {'counter' if name.endswith('_total') else 'gauge'}")
+
+        for pool_name, pool in pools.items():
+            lines.append(f'{metric}{{pool="{pool_name}"}} {pool_status(pool)[name]}')
+
+    caches = {"cache": get_cache(), "document_cache": document_cache, "stats_cache": stats_cache}
+
+    for prefix, cache in caches.items():
+        for name, value in cache.stats().items():
+            metric = f"films_api_{prefix}_{name}"
+            lines.append(f"# TYPE {metric} {'counter' if name.endswith('_total') else 'gauge'}")
+            lines.append(f"{metric} {value}")
+
+    if replicas:
+        lines.append("# TYPE films_api_replica_healthy gauge")
+
+        for index, replica in enumerate(replicas):
+            lines.append(f'films_api_replica_healthy{{replica="{index}"}} {int(replica.healthy)}')
+
+    lines.append("# TYPE films_api_subscribers gauge")
+
+    for table in TABLES:
+        lines.append(f'films_api_subscribers{{table="{table}"}} {change_hub.subscriber_count(table)}')
+
+    # slow consumers and the subscribers of a lost LISTEN connection.
+    lines.append("# TYPE films_api_subscribers_disconnected_total counter")
+    lines.append(f"films_api_subscribers_disconnected_total {change_hub.disconnected_total}")
+
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+
+    return "\n".join(lines) + "\n"
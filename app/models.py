@@ -13,21 +13,36 @@ from sqlalchemy import (
     Boolean,
     Date,
     Text,
-    ForeignKey
+    ForeignKey,
+    Index,
+    UniqueConstraint
     )
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime, date
 
 
+# NOTE: indexes and constraints are created by app/database/migrations.py,
+# they are only declared here so the metadata matches the database.
 class FilmActor(base):
     __tablename__ = "filmactors"
+    __table_args__ = (
+        UniqueConstraint("film_id", "actor_id", name="uq_filmactors_film_id_actor_id"),
+        Index("ix_filmactors_actor_id", "actor_id"),
+        Index("ix_filmactors_timestamp_uuid", "timestamp", "uuid"),
+        )
 
     uuid = Column(String(36), primary_key=True, nullable=False)
-    film_id = Column("film_id", ForeignKey("films.uuid"), nullable=False)
-    actor_id = Column("actor_id", ForeignKey("actors.uuid"), nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow())
+    # the same ON DELETE CASCADE as migration 1, the set-based deletes rely on it.
+    film_id = Column("film_id", ForeignKey("films.uuid", ondelete="CASCADE"), nullable=False)
+    actor_id = Column("actor_id", ForeignKey("actors.uuid", ondelete="CASCADE"), nullable=False)
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow())
 
 class Film(base):
     __tablename__ = "films"
+    __table_args__ = (
+        Index("ix_films_timestamp_uuid", "timestamp", "uuid"),
+        Index("ix_films_title_uuid", "title", "uuid"),
+        )
 
     uuid = Column(String(36), primary_key=True, nullable=False)
     title = Column(String(255), nullable=False, unique=True)
@@ -35,20 +50,51 @@ class Film(base):
     language = Column(String(255), nullable=False)
     release = Column(Date, nullable=True, default=date(year=2011, month=1, day=1))
     is_premiere = Column(Boolean, default=False)
-    timestamp = Column(DateTime, default=datetime.utcnow())
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow())
 
     # create actors relationship
     actors = relationship("Actor", secondary="filmactors", back_populates="films")
 
 class Actor(base):
     __tablename__ = "actors"
+    __table_args__ = (
+        Index("ix_actors_name_uuid", "name", "uuid"),
+        Index("ix_actors_timestamp_uuid", "timestamp", "uuid"),
+        )
 
     uuid = Column(String(36), primary_key=True, nullable=False)
     name = Column(String(255), nullable=False)
     birth_date = Column(Date, nullable=True, default=date.today())
     biography = Column(Text, nullable=True)
     nationality = Column(String(255), nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow())
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow())
 
     films = relationship("Film", secondary="filmactors", back_populates="actors")
 
+
+# the denormalized read model of the combine queries, filled by app/read_model.py.
+class FilmCast(base):
+    __tablename__ = "film_casts"
+    __table_args__ = (
+        Index("ix_film_casts_title", "title"),
+        Index("ix_film_casts_stale_since", "stale_since", postgresql_where="stale_since IS NOT NULL"),
+        )
+
+    film_id = Column(ForeignKey("films.uuid", ondelete="CASCADE"), primary_key=True)
+    title = Column(String(255), nullable=False)
+    document = Column(JSONB, nullable=True)
+    stale_since = Column(DateTime(timezone=True), nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)
+
+class ActorFilmography(base):
+    __tablename__ = "actor_filmographies"
+    __table_args__ = (
+        Index("ix_actor_filmographies_name", "name"),
+        Index("ix_actor_filmographies_stale_since", "stale_since", postgresql_where="stale_since IS NOT NULL"),
+        )
+
+    actor_id = Column(ForeignKey("actors.uuid", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(255), nullable=False)
+    document = Column(JSONB, nullable=True)
+    stale_since = Column(DateTime(timezone=True), nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)
@@ -10,6 +10,9 @@ from app.inputs import (
     ActorCreateInput as actor_create_input,
     ActorUpdateInput as actor_update_input,
     FilmActorInput as film_actor_input,
+    FilmDeleteFilter as film_delete_filter,
+    ActorDeleteFilter as actor_delete_filter,
+    FilmActorDeleteFilter as film_actor_delete_filter,
     )
 from app.models import (
     Film as film_model,
@@ -28,10 +31,112 @@ from app.types import (
     FilmUpdateType as film_update_type,
     ActorUpdateType as actor_update_type,
     FilmActorTypeBase as film_actor_type_base,
+    BulkItemError as bulk_item_error,
+    FilmBulkCreateResponse as film_bulk_create_response,
+    ActorBulkCreateResponse as actor_bulk_create_response,
+    FilmActorBulkResponse as film_actor_bulk_response,
+    DeleteManyResponse as delete_many_response,
     )
-from app.config import SessionLocal as session_local
+from app.database.session import run_in_session
+from app.cache import invalidate_film, invalidate_actor
+from app.config import BULK_MAX_ITEMS
+from sqlalchemy import select, update, delete, func, literal, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from app.projection import map_rows
+from datetime import datetime
+from typing import Optional
 
 
+"""
+TODO: Define all bulk helper BELOW!
+"""
+# used by the bulk mutations before anything is sent to the database.
+def check_bulk_size(items: list) -> None:
+    if len(items) > BULK_MAX_ITEMS:
+        raise Exception(f"A bulk mutation accepts at most {BULK_MAX_ITEMS} items, got {len(items)}.")
+
+# returns why one bulk item does not fit the VARCHAR(255) and NOT NULL columns.
+def column_error(item, required: tuple, optional: tuple = ()) -> Optional[str]:
+    for field in required:
+        if getattr(item, field) is None:
+            return f"{field} is required."
+
+    # NOT NULL since migration 3, one explicit null would abort the whole multi-row INSERT.
+    if item.timestamp is None:
+        return "timestamp cannot be null."
+
+    for field in required + optional:
+        value = getattr(item, field)
+
+        if value is not None and len(value) > 255:
+            return f"{field} is longer than 255 characters."
+
+    return None
+
+"""
+TODO: Define all update helper BELOW!
+"""
+# psycopg2 and the asyncpg adapter of SQLAlchemy both expose the SQLSTATE as pgcode.
+def unique_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, "pgcode", None) == "23505"
+
+# the fields an update input really carries, strawberry leaves the omitted ones UNSET.
+def provided_values(data, not_null: tuple = ()) -> dict:
+    values = {key: value for key, value in data.__dict__.items() if value is not strawberry.UNSET}
+
+    for field in not_null:
+        if field in values and values[field] is None:
+            raise Exception(f"{field} cannot be null.")
+
+    for field, value in values.items():
+        if isinstance(value, str) and len(value) > 255 and field != "biography":
+            raise Exception(f"{field} is longer than 255 characters.")
+
+    # every write is a change, also when the client did not send a timestamp.
+    values.setdefault("timestamp", datetime.utcnow())
+
+    return values
+
+"""
+TODO: Define all delete helper BELOW!
+"""
+# WHERE conditions of a delete filter, lists match any of their values and every field must match.
+def filter_conditions(filter, columns: dict) -> list:
+    conditions = []
+
+    for field, column in columns.items():
+        value = getattr(filter, field)
+
+        if value is None:
+            continue
+
+        if isinstance(value, list):
+            check_bulk_size(value)
+            conditions.append(column.in_(value))
+        else:
+            conditions.append(column == value)
+
+    # an empty filter would delete the whole table.
+    if not conditions:
+        raise Exception(f"At least one of {', '.join(columns)} is required.")
+
+    return conditions
+
+# deleteFilms, deleteActors and disconnectFilmActors delete with one statement.
+def delete_statement(table, conditions: list):
+    return delete(table).where(*conditions).returning(*table.c)
+
+# one DELETE ... RETURNING in a CTE, the outer SELECT still sees the links the cascade removes.
+def counting_links_statement(table, conditions: list, link_column):
+    deleted = delete_statement(table, conditions).cte("deleted")
+    cascaded = select(func.count()).where(link_column == deleted.c.uuid).scalar_subquery()
+
+    return select(deleted, cascaded.label("cascaded"))
+
+def delete_counting_links(session, table, conditions: list, link_column) -> list:
+    return session.execute(counting_links_statement(table, conditions, link_column)).all()
+
 """
 TODO: Define main Mutation class BELOW!
 """
@@ -49,12 +154,12 @@ class Mutation:
         or also fill in these fields with your own data"""
         )
     # create film data.
-    def add_film(
+    async def add_film(
         self, 
         info: type_info,
         input: film_create_input,
         ) -> film_create_response:
-        with session_local() as session:
+        def write(session) -> film_type_base:
             database_film = film_model(
                 uuid=uuid().hex,
                 title=input.title,
@@ -69,77 +174,249 @@ class Mutation:
             session.commit()
             session.refresh(database_film)
 
-        new_film = film_type_base(
-            uuid=database_film.uuid,
-            title=database_film.title,
-            genre=database_film.genre,
-            language=database_film.language,
-            release=database_film.release,
-            is_premiere=database_film.is_premiere,
-            timestamp=database_film.timestamp,
-        )
+            return film_type_base(
+                uuid=database_film.uuid,
+                title=database_film.title,
+                genre=database_film.genre,
+                language=database_film.language,
+                release=database_film.release,
+                is_premiere=database_film.is_premiere,
+                timestamp=database_film.timestamp,
+            )
+
+        new_film = await run_in_session(write)
+        invalidate_film(title=new_film.title, uuid=new_film.uuid)
         response = message_response(message=f"Film '{input.title}' successfully created.")
         
         return film_create_response(film=new_film, response=response)
     
+    @strawberry.mutation(
+        description="""Useful for creating many Film data at once.\n\
+        NOTE: all films are written with one multi-row INSERT. \
+        Invalid items and titles that already exist are skipped and reported in errors, \
+        the other films are still created."""
+        )
+    async def add_films(
+        self,
+        info: type_info,
+        inputs: list[film_create_input],
+        ) -> film_bulk_create_response:
+        check_bulk_size(inputs)
+
+        def write(session) -> tuple[list[film_type_base], list[bulk_item_error]]:
+            errors = []
+            rows_by_title = {}
+
+            for index, item in enumerate(inputs):
+                message = column_error(item, required=("title", "genre", "language"))
+
+                if message is None and item.title in rows_by_title:
+                    message = f"Film '{item.title}' appears more than once."
+
+                if message is not None:
+                    errors.append(bulk_item_error(index=index, message=message))
+                    continue
+
+                rows_by_title[item.title] = (index, dict(
+                    uuid=uuid().hex,
+                    title=item.title,
+                    genre=item.genre,
+                    language=item.language,
+                    release=item.release,
+                    is_premiere=item.is_premiere,
+                    timestamp=item.timestamp
+                ))
+
+            created = {}
+
+            if rows_by_title:
+                table = film_model.__table__
+                statement = insert(table).on_conflict_do_nothing(index_elements=[table.c.title]).returning(*table.c)
+
+                for row in session.execute(statement, [row for _, row in rows_by_title.values()]):
+                    created[row.title] = film_type_base(**row._mapping)
+
+                session.commit()
+
+            films = []
+            for title, (index, _) in rows_by_title.items():
+                if title in created:
+                    films.append(created[title])
+                else:
+                    errors.append(bulk_item_error(index=index, message=f"Film '{title}' already exists."))
+
+            return films, sorted(errors, key=lambda error: error.index)
+
+        films, errors = await run_in_session(write)
+
+        for film in films:
+            invalidate_film(title=film.title, uuid=film.uuid)
+
+        response = message_response(message=f"{len(films)} films successfully created, {len(errors)} skipped.")
+
+        return film_bulk_create_response(films=films, errors=errors, response=response)
+
     @strawberry.mutation(
         description="""Useful for updating one Film data.\n\
         NOTE: All field are Optional You can leave these optional fields blank, \
         or also fill in these fields with your own data"""
         )
-    def update_film(
+    async def update_film(
         self,
         info: type_info,
         title: str,
         data: film_update_input
     ) -> film_update_response:
-        with session_local() as session:
-            film = session.query(film_model).filter(film_model.title == title).first()
+        values = provided_values(data, not_null=("title", "genre", "language", "timestamp"))
+
+        # one UPDATE of the provided columns, RETURNING saves the SELECT before and the refresh after it.
+        def write(session) -> tuple[str, film_update_type]:
+            table = film_model.__table__
+
+            try:
+                film = session.execute(
+                    update(table).where(table.c.title == title).values(**values).returning(*table.c)
+                    ).first()
+            except IntegrityError as error:
+                if not unique_violation(error):
+                    raise
+
+                raise Exception(f"Film '{values.get('title', title)}' already exists.")
 
             if not film:
                 raise Exception(f"Film '{title}' not found.")
-            
-            for key, value in data.__dict__.items():
-                setattr(film, key, value)
-            
+
             session.commit()
-            session.refresh(film)
-        
-        update_film = film_update_type(
-            title=film.title,
-            genre=film.genre,
-            language=film.language,
-            release=film.release,
-            is_premiere=film.is_premiere,
-            timestamp=film.timestamp
-        )
+
+            return film.uuid, film_update_type(
+                title=film.title,
+                genre=film.genre,
+                language=film.language,
+                release=film.release,
+                is_premiere=film.is_premiere,
+                timestamp=film.timestamp
+            )
+
+        film_id, update_film = await run_in_session(write)
+        invalidate_film(title=title, uuid=film_id)
+        invalidate_film(title=update_film.title)
         response = message_response(message=f"Film '{title}' successfully updated.")
 
         return film_update_response(film=update_film, response=response)
+
+    @strawberry.mutation(
+        description="""Useful for creating a Film, or updating the Film with the same title.\n\
+        NOTE: it is one INSERT ... ON CONFLICT statement, \
+        an existing film keeps its UUID and gets every other field of the input."""
+        )
+    async def upsert_film(
+        self,
+        info: type_info,
+        input: film_create_input,
+        ) -> film_create_response:
+        message = column_error(input, required=("title", "genre", "language"))
+
+        if message is not None:
+            raise Exception(message)
+
+        def write(session) -> film_type_base:
+            table = film_model.__table__
+            statement = insert(table).values(
+                uuid=uuid().hex,
+                title=input.title,
+                genre=input.genre,
+                language=input.language,
+                release=input.release,
+                is_premiere=input.is_premiere,
+                timestamp=input.timestamp
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.title],
+                set_={column: statement.excluded[column] for column in ("genre", "language", "release", "is_premiere", "timestamp")}
+            ).returning(*table.c)
+
+            film = map_rows(film_type_base, session.execute(statement).all())[0]
+
+            session.commit()
+
+            return film
+
+        film = await run_in_session(write)
+        invalidate_film(title=film.title, uuid=film.uuid)
+        response = message_response(message=f"Film '{film.title}' successfully saved.")
+
+        return film_create_response(film=film, response=response)
     
     @strawberry.mutation(
         description="""Useful for deleting one Film data.\n\
         NOTE: All field are Optional You can leave these optional fields blank, \
         or also fill in these fields with your own data"""
         )
-    def delete_film(
+    async def delete_film(
         self,
         info: type_info,
         title: str,
     ) -> message_response:
-        with session_local() as session:
-            film = session.query(film_model).filter(film_model.title == str).first()
+        def write(session) -> str:
+            film = session.query(film_model).filter(film_model.title == title).first()
 
             if not film:
                 raise Exception(f"Film '{title}' not found.")
             
+            film_id = film.uuid
+
             session.delete(film)
             session.commit()
-            session.close()
+
+            return film_id
+
+        film_id = await run_in_session(write)
+        invalidate_film(title=title, uuid=film_id)
         
         return message_response(
             message=f"Film {title} successfully deleted."
         )
+
+    @strawberry.mutation(
+        description="""Useful for deleting many Films at once, e.g. by IDs, titles or genre.\n\
+        NOTE: it is one DELETE ... RETURNING statement, \
+        the connections to actors are deleted by the database (ON DELETE CASCADE) and counted."""
+        )
+    async def delete_films(
+        self,
+        info: type_info,
+        filter: film_delete_filter,
+        ) -> delete_many_response:
+        table = film_model.__table__
+        conditions = filter_conditions(filter, {
+            "ids": table.c.uuid,
+            "titles": table.c.title,
+            "genre": table.c.genre,
+            "language": table.c.language,
+        })
+
+        def write(session) -> list:
+            rows = delete_counting_links(session, table, conditions, film_actor_model.__table__.c.film_id)
+
+            if rows:
+                session.commit()
+
+            return rows
+
+        rows = await run_in_session(write)
+
+        for row in rows:
+            invalidate_film(title=row.title, uuid=row.uuid)
+
+        cascaded = sum(row.cascaded for row in rows)
+        response = message_response(message=f"{len(rows)} films and {cascaded} connections successfully deleted.")
+
+        return delete_many_response(
+            ids=[row.uuid for row in rows],
+            deleted_count=len(rows),
+            cascaded_count=cascaded,
+            response=response
+        )
     
     @strawberry.mutation(
         description="""Useful for creating one Actor data.\n\
@@ -147,12 +424,12 @@ class Mutation:
         You can leave these optional fields blank, \
         or also fill in these fields with your own data"""
         )
-    def add_actor(
+    async def add_actor(
         self, 
         info: type_info,
         input: actor_create_input
         ) -> actor_create_response:
-            with session_local() as session:
+            def write(session) -> actor_type_base:
                 database_actor = actor_model(
                     uuid=uuid().hex,
                     name=input.name,
@@ -166,15 +443,18 @@ class Mutation:
                 session.commit()
                 session.refresh(database_actor)
             
-            new_actor = actor_type_base(
-                uuid=database_actor.uuid,
-                name=database_actor.name,
-                birth_date=database_actor.birth_date,
-                biography=database_actor.biography,
-                nationality=database_actor.nationality,
-                timestamp=database_actor.timestamp
-            )
+                return actor_type_base(
+                    uuid=database_actor.uuid,
+                    name=database_actor.name,
+                    birth_date=database_actor.birth_date,
+                    biography=database_actor.biography,
+                    nationality=database_actor.nationality,
+                    timestamp=database_actor.timestamp
+                )
 
+            new_actor = await run_in_session(write)
+            # names are not unique, a cached getActor(name) may have to return another row now.
+            invalidate_actor(name=input.name)
             response = message_response(message=f"Actor '{input.name}' successfully created.")
 
             return actor_create_response(
@@ -182,78 +462,241 @@ class Mutation:
                 response=response
             )
     
+    @strawberry.mutation(
+        description="""Useful for creating many Actor data at once.\n\
+        NOTE: all actors are written with one multi-row INSERT. \
+        Invalid items are skipped and reported in errors, \
+        the other actors are still created."""
+        )
+    async def add_actors(
+        self,
+        info: type_info,
+        inputs: list[actor_create_input],
+        ) -> actor_bulk_create_response:
+            check_bulk_size(inputs)
+
+            def write(session) -> tuple[list[actor_type_base], list[bulk_item_error]]:
+                errors = []
+                rows = []
+
+                for index, item in enumerate(inputs):
+                    message = column_error(item, required=("name",), optional=("nationality",))
+
+                    if message is not None:
+                        errors.append(bulk_item_error(index=index, message=message))
+                        continue
+
+                    rows.append(dict(
+                        uuid=uuid().hex,
+                        name=item.name,
+                        birth_date=item.birth_date,
+                        biography=item.biography,
+                        nationality=item.nationality,
+                        timestamp=item.timestamp
+                    ))
+
+                actors = []
+
+                if rows:
+                    table = actor_model.__table__
+                    statement = insert(table).returning(*table.c, sort_by_parameter_order=True)
+                    actors = [actor_type_base(**row._mapping) for row in session.execute(statement, rows)]
+
+                    session.commit()
+
+                return actors, errors
+
+            actors, errors = await run_in_session(write)
+
+            for actor in actors:
+                invalidate_actor(name=actor.name)
+
+            response = message_response(message=f"{len(actors)} actors successfully created, {len(errors)} skipped.")
+
+            return actor_bulk_create_response(actors=actors, errors=errors, response=response)
+
     @strawberry.mutation(
         description="""Useful for updating one Actor data.\n\
         NOTE: All field are Optional You can leave these optional fields blank, \
         or also fill in these fields with your own data"""
         )
-    def update_actor(
+    async def update_actor(
         self, 
         info: type_info, 
         name: str, 
         data: actor_update_input
         ) -> actor_update_response:
-            with session_local() as session:
-                actor = session.query(actor_model).filter(actor_model.name == name).first()
+            values = provided_values(data, not_null=("name", "timestamp"))
+
+            def write(session) -> tuple[str, actor_update_type]:
+                table = actor_model.__table__
+                # names are not unique, like before only the first actor with that name is updated.
+                first_actor = select(table.c.uuid).where(table.c.name == name).limit(1).scalar_subquery()
+
+                try:
+                    actor = session.execute(
+                        update(table).where(table.c.uuid == first_actor).values(**values).returning(*table.c)
+                        ).first()
+                except IntegrityError as error:
+                    if not unique_violation(error):
+                        raise
+
+                    raise Exception(f"Actor '{values.get('name', name)}' already exists.")
 
                 if not actor:
                     raise Exception(f"Actor '{name}' not found.")
-                
-                for key, value in data.__dict__.items():
-                    setattr(actor, key, value)
 
                 session.commit()
-                session.refresh(actor)
-
-            update_actor = actor_update_type(
-                name=actor.name,
-                birth_date=actor.birth_date,
-                biography=actor.biography,
-                nationality=actor.nationality,
-                timestamp=actor.timestamp
-            )
 
+                return actor.uuid, actor_update_type(
+                    name=actor.name,
+                    birth_date=actor.birth_date,
+                    biography=actor.biography,
+                    nationality=actor.nationality,
+                    timestamp=actor.timestamp
+                )
+
+            actor_id, update_actor = await run_in_session(write)
+            invalidate_actor(name=name, uuid=actor_id)
+            invalidate_actor(name=update_actor.name)
             response = message_response(message=f"Actor '{name}' successfully updated.")
 
             return actor_update_response(
                 actor=update_actor,
                 response=response
             )
+
+    @strawberry.mutation(
+        description="""Useful for creating an Actor, or updating the Actor with the given ID.\n\
+        NOTE: it is one INSERT ... ON CONFLICT statement, \
+        without an actorId a new actor is always created."""
+        )
+    async def upsert_actor(
+        self,
+        info: type_info,
+        input: actor_create_input,
+        actor_id: Optional[str] = None,
+        ) -> actor_create_response:
+            message = column_error(input, required=("name",), optional=("nationality",))
+
+            if message is not None:
+                raise Exception(message)
+
+            def write(session) -> tuple[actor_type_base, Optional[str]]:
+                table = actor_model.__table__
+                new_id = actor_id or uuid().hex
+                # subqueries of RETURNING see the table as it was before the statement.
+                old_name = select(table.c.name).where(table.c.uuid == new_id).scalar_subquery().label("old_name")
+                statement = insert(table).values(
+                    uuid=new_id,
+                    name=input.name,
+                    birth_date=input.birth_date,
+                    biography=input.biography,
+                    nationality=input.nationality,
+                    timestamp=input.timestamp
+                )
+                statement = statement.on_conflict_do_update(
+                    index_elements=[table.c.uuid],
+                    set_={column: statement.excluded[column] for column in ("name", "birth_date", "biography", "nationality", "timestamp")}
+                ).returning(*table.c, old_name)
+
+                rows = session.execute(statement).all()
+                actor = map_rows(actor_type_base, rows)[0]
+
+                session.commit()
+
+                return actor, rows[0].old_name
+
+            actor, old_name = await run_in_session(write)
+
+            if old_name is not None:
+                invalidate_actor(name=old_name)
+
+            invalidate_actor(name=actor.name, uuid=actor.uuid)
+            response = message_response(message=f"Actor '{actor.name}' successfully saved.")
+
+            return actor_create_response(actor=actor, response=response)
     
     @strawberry.mutation(
         description="""Useful for deleting one Actor data.\n\
         NOTE: All field are Optional You can leave these optional fields blank, \
         or also fill in these fields with your own data"""
         )
-    def delete_actor(
+    async def delete_actor(
         self, 
         info: type_info, 
         name: str
         ) -> message_response:
-            with session_local() as session:
+            def write(session) -> str:
                 actor = session.query(actor_model).filter(actor_model.name == name).first()
 
                 if not actor:
                     raise Exception(f"Actor '{name}' not found.")
                 
+                actor_id = actor.uuid
+
                 session.delete(actor)
                 session.commit()
-                session.close()
+
+                return actor_id
+
+            actor_id = await run_in_session(write)
+            invalidate_actor(name=name, uuid=actor_id)
             
             return message_response(
                 message=f"Actor {name} successfully deleted."
             )
+
+    @strawberry.mutation(
+        description="""Useful for deleting many Actors at once, e.g. by IDs, names or nationality.\n\
+        NOTE: it is one DELETE ... RETURNING statement, \
+        the connections to films are deleted by the database (ON DELETE CASCADE) and counted."""
+        )
+    async def delete_actors(
+        self,
+        info: type_info,
+        filter: actor_delete_filter,
+        ) -> delete_many_response:
+            table = actor_model.__table__
+            conditions = filter_conditions(filter, {
+                "ids": table.c.uuid,
+                "names": table.c.name,
+                "nationality": table.c.nationality,
+            })
+
+            def write(session) -> list:
+                rows = delete_counting_links(session, table, conditions, film_actor_model.__table__.c.actor_id)
+
+                if rows:
+                    session.commit()
+
+                return rows
+
+            rows = await run_in_session(write)
+
+            for row in rows:
+                invalidate_actor(name=row.name, uuid=row.uuid)
+
+            cascaded = sum(row.cascaded for row in rows)
+            response = message_response(message=f"{len(rows)} actors and {cascaded} connections successfully deleted.")
+
+            return delete_many_response(
+                ids=[row.uuid for row in rows],
+                deleted_count=len(rows),
+                cascaded_count=cascaded,
+                response=response
+            )
     
     @strawberry.mutation(
         description="""This is useful for creating a relationship between\
         the Film table and the Actor table."""
         )
-    def create_film_actor_connection(
+    async def create_film_actor_connection(
         self, 
         info: type_info, 
         data: film_actor_input
         ) -> film_actor_response:
-            with session_local() as session:
+            def write(session) -> film_actor_type_base:
                 film = session.query(film_model).filter(film_model.uuid == data.film_id).first()
                 actor = session.query(actor_model).filter(actor_model.uuid == data.actor_id).first()
 
@@ -271,16 +714,24 @@ class Mutation:
                 )
 
                 session.add(film_actor)
-                session.commit()
+
+                try:
+                    session.commit()
+                except IntegrityError:
+                    raise Exception(f"Film with ID '{data.film_id}' and Actor with ID '{data.actor_id}' are already connected.")
+
                 session.refresh(film_actor)
             
-            new_film_actor = film_actor_type_base(
-                uuid=film_actor.uuid,
-                film_id=film_actor.film_id,
-                actor_id=film_actor.actor_id,
-                timestamp=film_actor.timestamp
-            )
+                return film_actor_type_base(
+                    uuid=film_actor.uuid,
+                    film_id=film_actor.film_id,
+                    actor_id=film_actor.actor_id,
+                    timestamp=film_actor.timestamp
+                )
 
+            new_film_actor = await run_in_session(write)
+            invalidate_film(uuid=new_film_actor.film_id)
+            invalidate_actor(uuid=new_film_actor.actor_id)
             response = message_response(message=f"Films and Actors successfully connected.")
 
             return film_actor_response(
@@ -288,26 +739,149 @@ class Mutation:
                 response=response
             )
     
+    @strawberry.mutation(
+        description="""This is useful for creating many relationships between\
+        the Film table and the Actor table at once.\n\
+        NOTE: all IDs are validated with one query and the links are written with one multi-row INSERT. \
+        Unknown IDs and duplicate links are skipped and reported in errors."""
+        )
+    async def connect_film_actors(
+        self,
+        info: type_info,
+        data: list[film_actor_input],
+        ) -> film_actor_bulk_response:
+            check_bulk_size(data)
+
+            def write(session) -> tuple[list[film_actor_type_base], list[bulk_item_error]]:
+                found = set(session.execute(union_all(
+                    select(literal("film"), film_model.uuid).where(film_model.uuid.in_({item.film_id for item in data})),
+                    select(literal("actor"), actor_model.uuid).where(actor_model.uuid.in_({item.actor_id for item in data})),
+                    )).all())
+
+                errors = []
+                rows_by_pair = {}
+
+                for index, item in enumerate(data):
+                    pair = (item.film_id, item.actor_id)
+
+                    if item.timestamp is None:
+                        message = "timestamp cannot be null."
+                    elif ("film", item.film_id) not in found:
+                        message = f"Film with ID '{item.film_id}' not found."
+                    elif ("actor", item.actor_id) not in found:
+                        message = f"Actor with ID '{item.actor_id}' not found."
+                    elif pair in rows_by_pair:
+                        message = "This connection appears more than once."
+                    else:
+                        rows_by_pair[pair] = (index, dict(
+                            uuid=uuid().hex,
+                            film_id=item.film_id,
+                            actor_id=item.actor_id,
+                            timestamp=item.timestamp
+                        ))
+                        continue
+
+                    errors.append(bulk_item_error(index=index, message=message))
+
+                created = {}
+
+                if rows_by_pair:
+                    table = film_actor_model.__table__
+                    statement = insert(table).on_conflict_do_nothing(
+                        index_elements=[table.c.film_id, table.c.actor_id]
+                        ).returning(*table.c)
+
+                    for row in session.execute(statement, [row for _, row in rows_by_pair.values()]):
+                        created[(row.film_id, row.actor_id)] = film_actor_type_base(**row._mapping)
+
+                    session.commit()
+
+                film_actors = []
+                for pair, (index, _) in rows_by_pair.items():
+                    if pair in created:
+                        film_actors.append(created[pair])
+                    else:
+                        errors.append(bulk_item_error(index=index, message="Film and Actor are already connected."))
+
+                return film_actors, sorted(errors, key=lambda error: error.index)
+
+            film_actors, errors = await run_in_session(write)
+
+            for film_actor in film_actors:
+                invalidate_film(uuid=film_actor.film_id)
+                invalidate_actor(uuid=film_actor.actor_id)
+
+            response = message_response(message=f"{len(film_actors)} connections successfully created, {len(errors)} skipped.")
+
+            return film_actor_bulk_response(film_actors=film_actors, errors=errors, response=response)
+    
     @strawberry.field(
         description="""This is useful for deleting the relationship\
         between the Film table and the Actor table.\nNOTE: you must input UUID from FilmActors \
         table as an argument for deleting the connection between Film and Actor table"""
         )
-    def delete_film_actor_connection(
+    async def delete_film_actor_connection(
         self, 
         info: type_info, 
         film_actors_id: str
         ) -> message_response:
-            with session_local() as session:
+            def write(session) -> tuple[str, str]:
                 film_actor = session.query(film_actor_model).filter(film_actor_model.uuid == film_actors_id).first()
 
                 if not film_actor:
-                    raise Exception(f"Film with ID '{data.film_id}' or Actor with ID '{data.actor_id}' not found.")
+                    raise Exception(f"Film Actor with ID '{film_actors_id}' not found.")
                 
+                film_id, actor_id = film_actor.film_id, film_actor.actor_id
+
                 session.delete(film_actor)
                 session.commit()
-                session.close()
+
+                return film_id, actor_id
+
+            film_id, actor_id = await run_in_session(write)
+            invalidate_film(uuid=film_id)
+            invalidate_actor(uuid=actor_id)
 
             return message_response(
-                message=f"Film Actor with Film ID '{film_actor.film_id}' and Actor ID '{film_actor.actor_id}' successfully deleted."
+                message=f"Film Actor with Film ID '{film_id}' and Actor ID '{actor_id}' successfully deleted."
+            )
+
+    @strawberry.mutation(
+        description="""This is useful for deleting many relationships between\
+        the Film table and the Actor table at once, e.g. all links of some actors.\n\
+        NOTE: it is one DELETE ... RETURNING statement."""
+        )
+    async def disconnect_film_actors(
+        self,
+        info: type_info,
+        filter: film_actor_delete_filter,
+        ) -> delete_many_response:
+            table = film_actor_model.__table__
+            conditions = filter_conditions(filter, {
+                "ids": table.c.uuid,
+                "film_ids": table.c.film_id,
+                "actor_ids": table.c.actor_id,
+            })
+
+            def write(session) -> list:
+                rows = session.execute(delete_statement(table, conditions)).all()
+
+                if rows:
+                    session.commit()
+
+                return rows
+
+            rows = await run_in_session(write)
+
+            for row in rows:
+                invalidate_film(uuid=row.film_id)
+                invalidate_actor(uuid=row.actor_id)
+
+            response = message_response(message=f"{len(rows)} connections successfully deleted.")
+
+            return delete_many_response(
+                ids=[row.uuid for row in rows],
+                deleted_count=len(rows),
+                cascaded_count=0,
+                response=response
             )
@@ -0,0 +1,159 @@
+# app/notifications.py
+
+"""Fan out the catalog changes of Postgres to the GraphQL subscriptions.
+
+The triggers of migration 6 send every committed change of films, actors
+and filmactors on the catalog_changes channel. Every process keeps one
+LISTEN connection, opened by its first subscription, and copies each
+change into the queue of every subscriber of that table.
+
+A subscriber that falls SUBSCRIPTION_QUEUE_SIZE changes behind is
+disconnected with an error instead of slowing down the listener (and so
+every other subscriber), the same happens to all of them when the LISTEN
+connection is lost. Either way the client missed changes, so it has to
+re-read what it shows and subscribe again.
+"""
+
+import asyncio
+import json
+
+from sqlalchemy.engine import make_url
+from app.models import Film, Actor, FilmActor
+from app.projection import decode_json_row
+from app.config import (
+    SQLALCHEMY_DATABASE_URL,
+    SUBSCRIPTION_QUEUE_SIZE,
+    SUBSCRIPTION_RECONNECT_INTERVAL,
+    )
+from typing import AsyncIterator, Optional
+
+
+CHANNEL = "catalog_changes"
+TABLES = {"films": Film.__table__, "actors": Actor.__table__, "filmactors": FilmActor.__table__}
+
+"""
+TODO: Define all change hub BELOW!
+"""
+class MissedChanges(Exception):
+    pass
+
+class ChangeHub:
+    def __init__(self) -> None:
+        self.subscribers = {table: set() for table in TABLES}
+        self.listener: Optional[asyncio.Task] = None
+        self.disconnected_total = 0
+
+    def publish(self, change: dict) -> None:
+        for queue in list(self.subscribers.get(change["table"], ())):
+            if queue.full():
+                self.disconnect(queue, f"fell more than {SUBSCRIPTION_QUEUE_SIZE} changes behind")
+            else:
+                queue.put_nowait(change)
+
+    # the queued changes are dropped, the subscriber only gets the error.
+    def disconnect(self, queue: asyncio.Queue, reason: str) -> None:
+        for subscribers in self.subscribers.values():
+            subscribers.discard(queue)
+
+        while not queue.empty():
+            queue.get_nowait()
+
+        queue.put_nowait(MissedChanges(f"Subscription {reason}, read the data again and subscribe again."))
+        self.disconnected_total += 1
+
+    def disconnect_all(self, reason: str) -> None:
+        for subscribers in self.subscribers.values():
+            for queue in list(subscribers):
+                self.disconnect(queue, reason)
+
+    async def changes(self, table: str) -> AsyncIterator[dict]:
+        queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+        self.subscribers[table].add(queue)
+        self.start()
+
+        try:
+            while True:
+                change = await queue.get()
+
+                if isinstance(change, MissedChanges):
+                    raise change
+
+                yield change
+        finally:
+            self.subscribers[table].discard(queue)
+
+    def subscriber_count(self, table: str) -> int:
+        return len(self.subscribers[table])
+
+    def start(self) -> None:
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(listen(self))
+
+    # used by the lifespan of main.py.
+    async def stop(self) -> None:
+        if self.listener is None:
+            return
+
+        self.listener.cancel()
+
+        try:
+            await self.listener
+        except asyncio.CancelledError:
+            pass
+
+        self.listener = None
+
+change_hub = ChangeHub()
+
+"""
+TODO: Define all listener BELOW!
+"""
+# the dates are parsed once here instead of once per subscriber.
+def decode_change(payload: str) -> dict:
+    change = json.loads(payload)
+    decode_json_row(TABLES[change["table"]], change["row"])
+
+    return change
+
+# a connection of its own, a pooled one would be taken from the pool for good.
+def connect():
+    # loaded with the first subscription, like the drivers of the engines.
+    import psycopg2
+
+    connection = psycopg2.connect(make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql").render_as_string(False))
+    connection.autocommit = True
+    connection.cursor().execute(f"LISTEN {CHANNEL}")
+
+    return connection
+
+async def listen(hub: ChangeHub) -> None:
+    loop = asyncio.get_running_loop()
+
+    while True:
+        try:
+            connection = await asyncio.to_thread(connect)
+        except Exception:
+            await asyncio.sleep(SUBSCRIPTION_RECONNECT_INTERVAL)
+            continue
+
+        # the event loop wakes the listener up when the socket has a notification, nothing polls.
+        readable = asyncio.Event()
+        fileno = connection.fileno()
+        loop.add_reader(fileno, readable.set)
+
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                connection.poll()
+
+                while connection.notifies:
+                    hub.publish(decode_change(connection.notifies.pop(0).payload))
+        except Exception:
+            # the changes sent until the reconnect are lost.
+            hub.disconnect_all("lost the connection to the database")
+        finally:
+            loop.remove_reader(fileno)
+            connection.close()
+
+        await asyncio.sleep(SUBSCRIPTION_RECONNECT_INTERVAL)
@@ -0,0 +1,126 @@
+# app/pagination.py
+
+import base64
+import json
+
+from datetime import date, datetime
+from sqlalchemy import select, func, tuple_
+from app.types import (
+    Connection as connection,
+    Edge as edge,
+    PageInfo as page_info,
+    )
+from app.projection import map_rows
+from typing import Any, Optional
+
+
+# the biggest page a client may ask for.
+MAX_PAGE_SIZE = 100
+
+# the page size without first or last.
+DEFAULT_PAGE_SIZE = 10
+
+"""
+TODO: Define all cursor function BELOW!
+"""
+# turn the sort key of one row into an opaque cursor.
+def encode_cursor(sort: str, value: Any, uuid: str) -> str:
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+
+    raw = json.dumps([sort, value, uuid], separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+# turn a cursor back into the values of its sort key.
+def decode_cursor(cursor: str, sort: str, column) -> tuple:
+    try:
+        cursor_sort, value, uuid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise Exception(f"Cursor '{cursor}' is not valid.")
+
+    if cursor_sort != sort:
+        raise Exception(f"Cursor '{cursor}' does not belong to the '{sort}' sort order.")
+
+    python_type = column.type.python_type
+
+    if python_type in (date, datetime) and value is not None:
+        value = python_type.fromisoformat(value)
+
+    return value, uuid
+
+"""
+TODO: Define all pagination function BELOW!
+"""
+# one page after or before the cursors, with one extra row that tells whether there is another page.
+def page_statement(
+    model,
+    columns: list,
+    sort: str,
+    limit: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    backward: bool = False,
+    ):
+    sort_column = getattr(model, sort)
+    keyset = tuple_(sort_column, model.uuid)
+    # the sort key is always read, the cursors are built from it.
+    statement = select(*dict.fromkeys([*columns, sort_column, model.uuid]))
+
+    if after is not None:
+        statement = statement.where(keyset > tuple_(*decode_cursor(after, sort, sort_column)))
+
+    if before is not None:
+        statement = statement.where(keyset < tuple_(*decode_cursor(before, sort, sort_column)))
+
+    if backward:
+        statement = statement.order_by(sort_column.desc(), model.uuid.desc())
+    else:
+        statement = statement.order_by(sort_column, model.uuid)
+
+    return statement.limit(limit + 1)
+
+# build one page with a keyset over (sort column, uuid), so deep pages cost the same as the first.
+# only `columns` are selected, the nodes are built from the partial rows.
+def paginate(
+    session,
+    model,
+    columns: list,
+    sort: str,
+    node_type: Any,
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    last: Optional[int] = None,
+    before: Optional[str] = None,
+    ) -> connection:
+    if first is not None and last is not None:
+        raise Exception("Use either first or last, not both.")
+
+    backward = last is not None
+    limit = last if backward else (first if first is not None else DEFAULT_PAGE_SIZE)
+
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise Exception(f"Page size must be between 1 and {MAX_PAGE_SIZE}.")
+
+    rows = session.execute(page_statement(model, columns, sort, limit, after, before, backward)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if backward:
+        rows.reverse()
+
+    edges = [edge(
+        node=node,
+        cursor=encode_cursor(sort, getattr(row, sort), row.uuid)
+    ) for node, row in zip(map_rows(node_type, rows), rows)]
+
+    return connection(
+        edges=edges,
+        page_info=page_info(
+            has_next_page=has_more if not backward else before is not None,
+            has_previous_page=has_more if backward else after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+        count_statement=select(func.count()).select_from(model),
+    )
@@ -0,0 +1,174 @@
+# app/persisted_queries.py
+
+"""Persisted queries and a cache of parsed, validated documents.
+
+Clients may send {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": ...}}}
+without the query text (the automatic persisted query protocol of Apollo).
+An unknown hash is answered with PersistedQueryNotFound, then the client
+sends the query together with its hash once and the hash alone afterwards.
+
+Every document is parsed and validated only once per process, later
+requests with the same query reuse it from an LRU cache keyed by hash.
+
+In production PERSISTED_QUERIES_ALLOWLIST can point to a manifest built
+from the client's operations, then only those operations are executed:
+
+    python -m app.persisted_queries queries/*.graphql -o persisted_queries.json
+"""
+
+import argparse
+import hashlib
+import json
+import pathlib
+import rich
+
+from graphql import GraphQLError, OperationType, parse, specified_rules
+from graphql.utilities import get_operation_ast
+from graphql.validation import validate
+from strawberry.extensions import SchemaExtension
+from app.cache import LocalCache, MISSING
+from app.config import PERSISTED_QUERIES_CACHE_SIZE
+from typing import Optional
+
+
+# the documents never get stale, only the least recently used ones are dropped.
+document_cache = LocalCache(max_size=PERSISTED_QUERIES_CACHE_SIZE, ttl=float("inf"))
+query_store = LocalCache(max_size=PERSISTED_QUERIES_CACHE_SIZE, ttl=float("inf"))
+
+# hash -> query of the manifest, None while every query is allowed.
+allowlist: Optional[dict] = None
+
+"""
+TODO: Define all persisted query helper BELOW!
+"""
+class PersistedQueryError(Exception):
+    def __init__(self, message: str, code: str) -> None:
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+# used by the router, returns the query text of a request (or None when there is none).
+def resolve_query(query: Optional[str], extensions: Optional[dict]) -> Optional[str]:
+    persisted = (extensions or {}).get("persistedQuery")
+
+    if persisted is None:
+        if query is not None and allowlist is not None and query_hash(query) not in allowlist:
+            raise PersistedQueryError("PersistedQueryNotAllowed", "PERSISTED_QUERY_NOT_ALLOWED")
+
+        return query
+
+    sha256_hash = persisted.get("sha256Hash")
+
+    if persisted.get("version") != 1 or not isinstance(sha256_hash, str):
+        raise PersistedQueryError("PersistedQueryNotSupported", "PERSISTED_QUERY_NOT_SUPPORTED")
+
+    if allowlist is not None:
+        if sha256_hash not in allowlist:
+            raise PersistedQueryError("PersistedQueryNotAllowed", "PERSISTED_QUERY_NOT_ALLOWED")
+
+        return allowlist[sha256_hash]
+
+    if query is not None:
+        if query_hash(query) != sha256_hash:
+            raise PersistedQueryError("provided sha does not match query", "INVALID_PERSISTED_QUERY_HASH")
+
+        query_store.set(sha256_hash, query)
+        return query
+
+    query = query_store.get(sha256_hash)
+
+    if query is MISSING:
+        raise PersistedQueryError("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+
+    return query
+
+# used by the router to tell mutations in a batch apart, from the document cache when possible.
+def is_mutation(operation: dict) -> bool:
+    try:
+        query = operation.get("query") or resolve_query(None, operation.get("extensions"))
+    except PersistedQueryError:
+        return False
+
+    if not query:
+        return False
+
+    cached = document_cache.get(query_hash(query))
+
+    try:
+        document = cached[0] if cached is not MISSING else parse(query)
+    except GraphQLError:
+        return False
+
+    operation_ast = get_operation_ast(document, operation.get("operationName"))
+    return operation_ast is not None and operation_ast.operation == OperationType.MUTATION
+
+# parse and validate every operation of the manifest before the first request comes in.
+def load_allowlist(path: str, schema) -> int:
+    global allowlist
+
+    manifest = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+
+    for sha256_hash, query in manifest.items():
+        if query_hash(query) != sha256_hash:
+            raise ValueError(f"Hash '{sha256_hash}' of {path} does not match its query.")
+
+        document = parse(query)
+        errors = validate(schema._schema, document, specified_rules)
+
+        if errors:
+            raise ValueError(f"Query '{sha256_hash}' of {path} is invalid: {errors[0].message}")
+
+        document_cache.set(sha256_hash, (document, errors))
+
+    allowlist = manifest
+    return len(manifest)
+
+"""
+TODO: Define all schema extension BELOW!
+"""
+class DocumentCache(SchemaExtension):
+    """Skip parsing and validation of documents that were seen before."""
+
+    def on_parse(self):
+        context = self.execution_context
+        self._key = query_hash(context.query) if context.query else None
+        self._cached = document_cache.get(self._key) if self._key else MISSING
+
+        if self._cached is not MISSING:
+            context.graphql_document = self._cached[0]
+
+        yield
+
+    def on_validate(self):
+        context = self.execution_context
+
+        # the validation of strawberry is skipped when the errors are already set.
+        if self._cached is not MISSING:
+            context.errors = list(self._cached[1])
+
+        yield
+
+        if self._cached is MISSING and self._key and context.graphql_document is not None:
+            document_cache.set(self._key, (context.graphql_document, list(context.errors or [])))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the persisted query allowlist of the clients.")
+    parser.add_argument("paths", nargs="+", type=pathlib.Path, help=".graphql files, one operation each")
+    parser.add_argument("-o", "--output", type=pathlib.Path, default=pathlib.Path("persisted_queries.json"))
+    args = parser.parse_args()
+
+    manifest = {}
+    for path in args.paths:
+        query = path.read_text(encoding="utf-8")
+        # fail at build time instead of at startup.
+        parse(query)
+        manifest[query_hash(query)] = query
+
+    args.output.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    rich.print(f"[bold green]{len(manifest)}[/bold green] queries written to {args.output} :white_check_mark:")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# app/projection.py
+
+import dataclasses
+import functools
+
+from datetime import date, datetime
+
+from strawberry.types import Info as type_info
+from strawberry.types.nodes import SelectedField as selected_field
+from strawberry.utils.str_converters import to_camel_case
+from typing import Any, Iterator, List
+
+
+# yield the fields of a selection set, with the fields of fragments inlined.
+def flatten_selections(selections: list) -> Iterator[selected_field]:
+    for selection in selections:
+        if isinstance(selection, selected_field):
+            yield selection
+        else:
+            yield from flatten_selections(selection.selections)
+
+# the columns of `model` that the client selected under `path` (e.g. "edges", "node").
+def selected_columns(info: type_info, model, *path: str, always: tuple = ("uuid",)) -> List[Any]:
+    fields = [child for field in info.selected_fields for child in flatten_selections(field.selections)]
+
+    for name in path:
+        fields = [
+            child 
+            for field in fields if field.name == name 
+            for child in flatten_selections(field.selections)
+            ]
+
+    columns = {to_camel_case(column.key): column.key for column in model.__table__.columns}
+    selected = {column for column in always}
+    selected.update(columns[field.name] for field in fields if field.name in columns)
+
+    # keep the table order, so the SELECT reads the same for the same selection.
+    return [getattr(model, column.key) for column in model.__table__.columns if column.key in selected]
+
+# the plain data fields of a strawberry type, fields with a resolver are left out.
+@functools.lru_cache(maxsize=None)
+def data_fields(type_class) -> tuple:
+    return tuple(field.name for field in dataclasses.fields(type_class) if field.init)
+
+def map_rows(type_class, rows: list) -> list:
+    """Build `type_class` objects straight from Core rows.
+
+    The values were already constrained by the database, so the dataclass
+    __init__ is skipped and every instance __dict__ is filled directly.
+    Fields that are not in the rows (not selected) are None, row columns
+    that are not fields (e.g. a join key or a rank) are ignored.
+    """
+    if not rows:
+        return []
+
+    fields = data_fields(type_class)
+    positions = [position for position, key in enumerate(rows[0]._fields) if key in fields]
+    keys = tuple(rows[0]._fields[position] for position in positions)
+    defaults = dict.fromkeys(fields)
+    new = object.__new__
+    objects = []
+
+    for row in rows:
+        values = defaults.copy()
+        values.update(zip(keys, [row[position] for position in positions]))
+
+        instance = new(type_class)
+        instance.__dict__ = values
+        objects.append(instance)
+
+    return objects
+
+# the same as map_rows for one dict, e.g. a row that was sent as JSON.
+def map_dict(type_class, values: dict) -> Any:
+    fields = data_fields(type_class)
+    instance = object.__new__(type_class)
+    instance.__dict__ = {**dict.fromkeys(fields), **{key: value for key, value in values.items() if key in fields}}
+
+    return instance
+
+# JSON has no dates, turn the ISO strings of a row back into the python types of its table.
+def decode_json_row(table, row: dict) -> dict:
+    for column in table.columns:
+        if row.get(column.key) is not None and column.type.python_type in (date, datetime):
+            row[column.key] = column.type.python_type.fromisoformat(row[column.key])
+
+    return row
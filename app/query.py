@@ -15,15 +15,65 @@ from app.types import (
     FilmActorTypeBase as film_actor_type_base,
     FilmType as film_type,
     ActorType as actor_type,
+    Connection as connection,
+    FilmSortKey as film_sort_key,
+    ActorSortKey as actor_sort_key,
+    FilmActorSortKey as film_actor_sort_key,
     )
-from app.config import SessionLocal as session_local
-from sqlalchemy import and_
+from app.pagination import paginate
+from app.search import search
+from app.projection import selected_columns, map_rows
+from app.cache import (
+    MISSING,
+    get_cache,
+    get_generation,
+    film_key,
+    actor_key,
+    versioned_key,
+    )
+from app.database.session import run_in_session
+from app.database.replicas import lagging_read, wrote_recently
+from app.read_model import read_film_cast, read_actor_filmography
+from app.stats import Stats as stats_type
+from app.config import READ_MODEL_ENABLED
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from app.schemas import FilmSchema as film_schema
 from pydantic.json_schema import model_json_schema
 from typing import Optional
 
 
+"""
+TODO: Define all statement helper BELOW!
+NOTE: app/database/explain_check.py EXPLAINs the same statements.
+"""
+# getFilm and getActor, by uuid when it is given.
+def entity_statement(model, key_column, key: str, uuid: Optional[str] = None):
+    condition = model.uuid == uuid if uuid is not None else key_column == key
+
+    return select(*model.__table__.columns).where(condition).limit(1)
+
+# getFilms and getActors, the rows after (next) or before `uuid`.
+def uuid_page_statement(model, columns: list, uuid: str, next: bool, limit: int):
+    statement = select(*columns)
+
+    if uuid != "" and next:
+        statement = statement.where(model.uuid > uuid).order_by(model.uuid)
+    elif uuid != "":
+        statement = statement.where(model.uuid < uuid).order_by(model.uuid.desc())
+    else:
+        statement = statement.order_by(model.uuid)
+
+    return statement.limit(limit)
+
+# getFilmActors, ordered by the primary key so the pages are stable and no sort is needed.
+def film_actors_statement(columns: list, skip: int, limit: int):
+    return select(*columns).order_by(film_actor_model.uuid).offset(skip).limit(limit)
+
+# getOneFilmCombineActors and getOneActorCombineFilms without the read model.
+def combine_statement(model, relationship, key_column, key: str):
+    return select(model).options(joinedload(relationship)).where(key_column == key).limit(1)
+
 """
 TODO: Define main Query class BELOW!
 """
@@ -37,134 +87,226 @@ class Query:
         description="Useful for fetching a list of movies from the server"
         )
     # get all films data from database.
-    def get_films(uuid: str = "", next: bool = False, limit: int = 10) -> list[film_type_base]:
-        with session_local() as session:
-            if uuid != "" and next:
-                films = session.query(film_model).where(film_model.uuid > uuid).order_by(film_model.uuid).limit(limit).all()
-            elif uuid != "" and not next:
-                films = session.query(film_model).where(film_model.uuid < uuid).order_by(film_model.uuid.desc()).limit(limit).all()
-            else:
-                films = session.query(film_model).order_by(film_model.uuid).limit(limit).all()
+    async def get_films(info: type_info, uuid: str = "", next: bool = False, limit: int = 10) -> list[film_type_base]:
+        # only the selected columns are read.
+        columns = selected_columns(info, film_model)
+
+        def fetch(session) -> list[film_type_base]:
+            films = session.execute(uuid_page_statement(film_model, columns, uuid, next, limit)).all()
+
+            if uuid != "" and not next:
+                films.reverse()
 
             if not films:
                 raise Exception("Data not found or empty.")
             
-            return [film_type_base(
-                uuid=film.uuid,
-                title=film.title,
-                genre=film.genre,
-                language=film.language,
-                release=film.release,
-                is_premiere=film.is_premiere,
-                timestamp=film.timestamp,
-            ) for film in films]
+            return map_rows(film_type_base, films)
+
+        return await run_in_session(fetch)
     
+    @strawberry.field(
+        description="""Useful for paging through movies with opaque cursors. \
+        Pass the endCursor of a page as after (or the startCursor as before together with last) \
+        to continue, every page costs the same no matter how deep it is."""
+        )
+    async def get_films_connection(
+        info: type_info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+        sort: film_sort_key = film_sort_key.TIMESTAMP,
+        ) -> connection[film_type_base]:
+        columns = selected_columns(info, film_model, "edges", "node")
+
+        return await run_in_session(
+            lambda session: paginate(session, film_model, columns, sort.value, film_type_base, first, after, last, before)
+            )
+
+    @strawberry.field(
+        description="""Useful for searching movies by title, genre and language. \
+        Words match as prefixes and titles also match with typos, the best matches come first."""
+        )
+    async def search_films(info: type_info, text: str, first: int = 10, after: Optional[str] = None) -> connection[film_type_base]:
+        columns = selected_columns(info, film_model, "edges", "node")
+
+        return await run_in_session(
+            lambda session: search(session, film_model, columns, film_model.title, text, film_type_base, first, after)
+            )
+
     @strawberry.field(
         description="""Useful for retrieving single movie data from the server. \
         To carry out this command, you need to enter the title argument, \
         which determines whether a film with the same title is recorded on the server or not."""
         )
     # get one film data from database.
-    def get_film(info: type_info, title: str, film_id: Optional[str] = None) -> film_type_base:
-        with session_local() as session:
-            if film_id is not None:
-                film = session.query(film_model).where(and_(film_model.title == title, film_model.uuid == film_id)).first()
-
-                if not film:
-                    raise Exception(f"Film '{title}' or ID '{film_id}' not found.")
-            else:
-                film = session.query(film_model).filter(film_model.title == title).first()
-
-                if not film:
-                    raise Exception(f"Film '{title}' not found.")
-
-            return film_type_base(
-                uuid=film.uuid,
-                title=film.title,
-                genre=film.genre,
-                language=film.language,
-                release=film.release,
-                is_premiere=film.is_premiere,
-                timestamp=film.timestamp
-            )
+    async def get_film(info: type_info, title: str, film_id: Optional[str] = None) -> film_type_base:
+        def fetch(session) -> tuple[Optional[film_type_base], bool]:
+            rows = session.execute(entity_statement(film_model, film_model.title, title, film_id)).all()
+            films = map_rows(film_type_base, rows)
+
+            return (films[0] if films else None), lagging_read(session)
+
+        # read through the cache, misses are not cached.
+        request = info.context.get("request")
+        key = versioned_key(film_key(title=title, uuid=film_id), request)
+        # a client that just wrote must not get a row cached before its write.
+        film = MISSING if request is not None and wrote_recently(request) else get_cache().get(key)
+
+        if film is MISSING:
+            generation = get_generation()
+            film, lagging = await run_in_session(fetch)
+
+            # rows of a lagging replica are not cached, and none read across a write.
+            if film is not None and not lagging and generation == get_generation():
+                get_cache().set(key, film)
+
+        if film_id is not None and (film is None or film.title != title):
+            raise Exception(f"Film '{title}' or ID '{film_id}' not found.")
+
+        if film is None:
+            raise Exception(f"Film '{title}' not found.")
+
+        return film
 
     @strawberry.field(
         description="""This is useful for retrieving Actor data from the server. \
         Usage can be done by limiting the amount of data retrieved."""
         )
-    def get_actors(uuid: str = "", next: bool = False, limit: int = 10) -> list[actor_type_base]:
-        with session_local() as session:
-            if uuid != "" and next:
-                actors = session.query(actor_model).where(actor_model.uuid > uuid).order_by(actor_model.uuid).limit(limit).all()
-            elif uuid != "" and not next:
-                actors = session.query(actor_model).where(actor_model.uuid < uuid).order_by(actor_model.uuid.desc()).limit(limit).all()
-            else:
-                actors = session.query(actor_model).order_by(actor_model.uuid).limit(limit).all()
+    async def get_actors(info: type_info, uuid: str = "", next: bool = False, limit: int = 10) -> list[actor_type_base]:
+        # only the selected columns are read, biography is skipped unless it is asked for.
+        columns = selected_columns(info, actor_model)
+
+        def fetch(session) -> list[actor_type_base]:
+            actors = session.execute(uuid_page_statement(actor_model, columns, uuid, next, limit)).all()
+
+            if uuid != "" and not next:
+                actors.reverse()
 
             if not actors:
                 raise Exception("Data not found or empty.")
         
-            return [actor_type_base(
-                uuid=actor.uuid,
-                name=actor.name,
-                birth_date=actor.birth_date,
-                biography=actor.biography,
-                nationality=actor.nationality,
-                timestamp=actor.timestamp
-            ) for actor in actors]
+            return map_rows(actor_type_base, actors)
+
+        return await run_in_session(fetch)
+
+    @strawberry.field(
+        description="""Useful for paging through actors with opaque cursors. \
+        Pass the endCursor of a page as after (or the startCursor as before together with last) \
+        to continue, every page costs the same no matter how deep it is."""
+        )
+    async def get_actors_connection(
+        info: type_info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+        sort: actor_sort_key = actor_sort_key.TIMESTAMP,
+        ) -> connection[actor_type_base]:
+        columns = selected_columns(info, actor_model, "edges", "node")
+
+        return await run_in_session(
+            lambda session: paginate(session, actor_model, columns, sort.value, actor_type_base, first, after, last, before)
+            )
+
+    @strawberry.field(
+        description="""Useful for searching actors by name, nationality and biography. \
+        Words match as prefixes and names also match with typos, the best matches come first."""
+        )
+    async def search_actors(info: type_info, text: str, first: int = 10, after: Optional[str] = None) -> connection[actor_type_base]:
+        columns = selected_columns(info, actor_model, "edges", "node")
+
+        return await run_in_session(
+            lambda session: search(session, actor_model, columns, actor_model.name, text, actor_type_base, first, after)
+            )
 
     @strawberry.field(
         description="""This is useful for retrieving a single Actor data from the server. \
         If the name argument does not have the same data in the "name" field in the Actor table, \
         it will return an Exception"""
         )
-    def get_actor(info: type_info, name: str, actor_id: Optional[str] = None) -> actor_type_base:
-        with session_local() as session:
-            if actor_id is not None:
-                actor = session.query(actor_model).where(and_(actor_model.name == name, actor_model.uuid == actor_id)).first()
-
-                if not actor:
-                    raise Exception(f"Actor '{name}' or ID '{actor_id}' not found")
-            else:
-                actor = session.query(actor_model).filter(actor_model.name == name).first()
-
-                if not actor:
-                    raise Exception(f"Actor '{name}' not found")
-            
-            return actor_type_base(
-                uuid=actor.uuid,
-                name=actor.name,
-                birth_date=actor.birth_date,
-                biography=actor.biography,
-                nationality=actor.nationality,
-                timestamp=actor.timestamp
-            )
+    async def get_actor(info: type_info, name: str, actor_id: Optional[str] = None) -> actor_type_base:
+        def fetch(session) -> tuple[Optional[actor_type_base], bool]:
+            rows = session.execute(entity_statement(actor_model, actor_model.name, name, actor_id)).all()
+            actors = map_rows(actor_type_base, rows)
+
+            return (actors[0] if actors else None), lagging_read(session)
+
+        # read through the cache, misses are not cached.
+        request = info.context.get("request")
+        key = versioned_key(actor_key(name=name, uuid=actor_id), request)
+        # a client that just wrote must not get a row cached before its write.
+        actor = MISSING if request is not None and wrote_recently(request) else get_cache().get(key)
+
+        if actor is MISSING:
+            generation = get_generation()
+            actor, lagging = await run_in_session(fetch)
+
+            # rows of a lagging replica are not cached, and none read across a write.
+            if actor is not None and not lagging and generation == get_generation():
+                get_cache().set(key, actor)
+
+        if actor_id is not None and (actor is None or actor.name != name):
+            raise Exception(f"Actor '{name}' or ID '{actor_id}' not found")
+
+        if actor is None:
+            raise Exception(f"Actor '{name}' not found")
+
+        return actor
     
     @strawberry.field(
         description="""Returns data from the FilmActors pivot table. \
         This can be used if you want ID data from each Film or Actor table."""
         )
-    def get_film_actors(skip: int = 0, limit: int = 100) -> list[film_actor_type_base]:
-        with session_local() as session:
-            film_actors = session.query(film_actor_model).offset(skip).limit(limit).all()
+    async def get_film_actors(info: type_info, skip: int = 0, limit: int = 100) -> list[film_actor_type_base]:
+        columns = selected_columns(info, film_actor_model)
+
+        def fetch(session) -> list[film_actor_type_base]:
+            film_actors = session.execute(film_actors_statement(columns, skip, limit)).all()
 
             if not film_actors:
                 raise Exception("FilmActors table does not have any data or is empty")
 
-            return [film_actor_type_base(
-                uuid=film_actor.uuid,
-                film_id=film_actor.film_id,
-                actor_id=film_actor.actor_id,
-                timestamp=film_actor.timestamp
-            ) for film_actor in film_actors]
+            return map_rows(film_actor_type_base, film_actors)
+
+        return await run_in_session(fetch)
+    
+    @strawberry.field(
+        description="""Returns pages of the FilmActors pivot table with opaque cursors. \
+        Unlike getFilmActors it does not use OFFSET, so deep pages stay fast."""
+        )
+    async def get_film_actors_connection(
+        info: type_info,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+        last: Optional[int] = None,
+        before: Optional[str] = None,
+        sort: film_actor_sort_key = film_actor_sort_key.TIMESTAMP,
+        ) -> connection[film_actor_type_base]:
+        columns = selected_columns(info, film_actor_model, "edges", "node")
+
+        return await run_in_session(
+            lambda session: paginate(session, film_actor_model, columns, sort.value, film_actor_type_base, first, after, last, before)
+            )
     
     @strawberry.field(
         description="""Returns data from the Films table combine with Actor table. \
         This can be used if you want ID data from Films table and Actors table in it."""
         )
-    def get_one_film_combine_actors(info: type_info, title: str) -> film_type:
-        with session_local() as session:
-            data_combine = session.query(film_model).options(joinedload(film_model.actors)).where(film_model.title == title).first()
+    async def get_one_film_combine_actors(info: type_info, title: str) -> film_type:
+        def fetch(session) -> film_type:
+            if READ_MODEL_ENABLED:
+                film = read_film_cast(session, title)
+
+                if film is not None:
+                    return film
+
+            data_combine = session.execute(
+                combine_statement(film_model, film_model.actors, film_model.title, title)
+                ).unique().scalar()
+
+            if not data_combine:
+                raise Exception(f"Film '{title}' not found.")
 
             actor_data = []
             for d in data_combine.actors:
@@ -188,14 +330,27 @@ class Query:
                 timestamp=data_combine.timestamp,
                 actors=actor_data
             )
+
+        return await run_in_session(fetch)
     
     @strawberry.field(
         description="""Returns data from the Actors table. \
         This can be used if you want ID data from each Film or Actor table."""
         )
-    def get_one_actor_combine_films(info: type_info, name: str) -> actor_type:
-        with session_local() as session:
-            data_combine = session.query(actor_model).options(joinedload(actor_model.films)).where(actor_model.name == name).first()
+    async def get_one_actor_combine_films(info: type_info, name: str) -> actor_type:
+        def fetch(session) -> actor_type:
+            if READ_MODEL_ENABLED:
+                actor = read_actor_filmography(session, name)
+
+                if actor is not None:
+                    return actor
+
+            data_combine = session.execute(
+                combine_statement(actor_model, actor_model.films, actor_model.name, name)
+                ).unique().scalar()
+
+            if not data_combine:
+                raise Exception(f"Actor '{name}' not found.")
 
             film_data = []
             for d in data_combine.films:
@@ -219,8 +374,12 @@ class Query:
                 timestamp=data_combine.timestamp,
                 films=film_data
             )
-    
 
+        return await run_in_session(fetch)
 
-
-        
+    @strawberry.field(
+        description="""Aggregates over the whole catalog, e.g. films per genre or the top actors. \
+        Computed in the database instead of paging through getFilms and getFilmActors."""
+        )
+    async def stats(info: type_info) -> stats_type:
+        return stats_type()
@@ -0,0 +1,230 @@
+# app/read_model.py
+
+"""A denormalized read model for the combine queries.
+
+film_casts holds one JSONB document per film with its actors, and
+actor_filmographies one per actor with its films. With READ_MODEL_ENABLED
+getOneFilmCombineActors and getOneActorCombineFilms read a single row by
+title or name instead of joining three tables.
+
+The triggers of migration 7 keep the titles and names current and mark
+the documents of every film and actor touched by a write as stale, in the
+transaction of that write. A background task of each worker rebuilds the
+stale documents every READ_MODEL_REFRESH_INTERVAL seconds. When a batch
+conflicts with a concurrent write it is refreshed again row by row, so a
+film that is written all the time only keeps its own document stale.
+
+A document that has been stale for longer than READ_MODEL_MAX_STALENESS
+seconds is not served, the resolver joins the tables instead. Staleness
+is measured by the clock of the primary: on a replica that is the commit
+time of the last transaction it replayed, which the heartbeat of the
+refresher (migration 9) moves every round. An answer from a replica can
+therefore be older than the bound by its replication lag plus one round.
+"""
+
+import asyncio
+
+from datetime import timedelta
+from sqlalchemy import select, or_, func, text
+from sqlalchemy.exc import DBAPIError
+from app.models import (
+    Film as film_model,
+    Actor as actor_model,
+    FilmCast as film_cast_model,
+    ActorFilmography as actor_filmography_model,
+    )
+from app.types import (
+    FilmTypeBase as film_type_base,
+    ActorTypeBase as actor_type_base,
+    FilmType as film_type,
+    ActorType as actor_type,
+    )
+from app.projection import map_dict, decode_json_row
+from app.database.session import run_in_session
+from app.config import (
+    READ_MODEL_MAX_STALENESS,
+    READ_MODEL_REFRESH_INTERVAL,
+    READ_MODEL_REFRESH_BATCH_SIZE,
+    )
+from typing import Optional
+
+
+"""
+TODO: Define all refresh statement BELOW!
+NOTE: SKIP LOCKED lets the workers refresh different rows, the rows a write
+is marking right now are left for the next round. OFFSET skips the rows that
+conflicted when refreshing row by row.
+"""
+REFRESH_FILM_CASTS = """
+    WITH stale AS (
+        SELECT film_id FROM film_casts
+        WHERE stale_since IS NOT NULL
+        ORDER BY stale_since
+        LIMIT :batch_size OFFSET :skip
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE film_casts SET
+        document = (
+            SELECT jsonb_build_object(
+                'film', to_jsonb(films) - 'search_vector',
+                'actors', coalesce((
+                    SELECT jsonb_agg(to_jsonb(actors) - 'search_vector' ORDER BY actors.name, actors.uuid)
+                    FROM filmactors
+                    JOIN actors ON actors.uuid = filmactors.actor_id
+                    WHERE filmactors.film_id = films.uuid
+                ), '[]'::jsonb)
+            )
+            FROM films
+            WHERE films.uuid = film_casts.film_id
+        ),
+        stale_since = NULL,
+        refreshed_at = now()
+    FROM stale
+    WHERE film_casts.film_id = stale.film_id
+"""
+
+REFRESH_ACTOR_FILMOGRAPHIES = """
+    WITH stale AS (
+        SELECT actor_id FROM actor_filmographies
+        WHERE stale_since IS NOT NULL
+        ORDER BY stale_since
+        LIMIT :batch_size OFFSET :skip
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE actor_filmographies SET
+        document = (
+            SELECT jsonb_build_object(
+                'actor', to_jsonb(actors) - 'search_vector',
+                'films', coalesce((
+                    SELECT jsonb_agg(to_jsonb(films) - 'search_vector' ORDER BY films.title)
+                    FROM filmactors
+                    JOIN films ON films.uuid = filmactors.film_id
+                    WHERE filmactors.actor_id = actors.uuid
+                ), '[]'::jsonb)
+            )
+            FROM actors
+            WHERE actors.uuid = actor_filmographies.actor_id
+        ),
+        stale_since = NULL,
+        refreshed_at = now()
+    FROM stale
+    WHERE actor_filmographies.actor_id = stale.actor_id
+"""
+
+REFRESH_STATEMENTS = (REFRESH_FILM_CASTS, REFRESH_ACTOR_FILMOGRAPHIES)
+
+"""
+TODO: Define all read model helper BELOW!
+"""
+# stale_since is written by the primary, so it is compared with the clock of the primary also on a replica.
+# pg_last_xact_replay_timestamp() is NULL on the primary.
+def primary_clock():
+    return func.coalesce(func.pg_last_xact_replay_timestamp(), func.now())
+
+# documents that were never built, or stale for longer than the bound, are not served.
+def servable(table):
+    return (
+        table.c.document.is_not(None),
+        or_(
+            table.c.stale_since.is_(None),
+            table.c.stale_since > primary_clock() - timedelta(seconds=READ_MODEL_MAX_STALENESS),
+            ),
+        )
+
+def film_cast_statement(title: str):
+    table = film_cast_model.__table__
+
+    return select(table.c.document).where(table.c.title == title, *servable(table)).limit(1)
+
+def actor_filmography_statement(name: str):
+    table = actor_filmography_model.__table__
+
+    return select(table.c.document).where(table.c.name == name, *servable(table)).limit(1)
+
+# used by getOneFilmCombineActors, None sends it to the live join.
+def read_film_cast(session, title: str) -> Optional[film_type]:
+    document = session.execute(film_cast_statement(title)).scalar()
+
+    if document is None:
+        return None
+
+    actors = [map_dict(actor_type_base, decode_json_row(actor_model.__table__, actor)) for actor in document["actors"]]
+
+    return map_dict(film_type, {**decode_json_row(film_model.__table__, document["film"]), "actors": actors})
+
+# used by getOneActorCombineFilms, None sends it to the live join.
+def read_actor_filmography(session, name: str) -> Optional[actor_type]:
+    document = session.execute(actor_filmography_statement(name)).scalar()
+
+    if document is None:
+        return None
+
+    films = [map_dict(film_type_base, decode_json_row(film_model.__table__, film)) for film in document["films"]]
+
+    return map_dict(actor_type, {**decode_json_row(actor_model.__table__, document["actor"]), "films": films})
+
+"""
+TODO: Define all refresher BELOW!
+"""
+# one transaction, returns the rows it refreshed.
+def refresh_batch(session, statement: str, batch_size: int, skip: int = 0) -> int:
+    # a write that commits while the documents are built makes this fail instead of clearing its mark.
+    session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    refreshed = session.execute(text(statement), {"batch_size": batch_size, "skip": skip}).rowcount
+    session.commit()
+
+    return refreshed
+
+# after a batch conflicted, so the rows that keep being written do not hold back the others.
+def refresh_row_by_row(session, statement: str) -> int:
+    refreshed, skipped = 0, 0
+
+    while refreshed + skipped < READ_MODEL_REFRESH_BATCH_SIZE:
+        try:
+            rows = refresh_batch(session, statement, 1, skipped)
+        except DBAPIError:
+            # the row stays stale for the next round.
+            session.rollback()
+            skipped += 1
+            continue
+
+        if not rows:
+            break
+
+        refreshed += rows
+
+    return refreshed
+
+# returns the most rows one of the statements refreshed.
+def refresh_stale(session) -> int:
+    refreshed = []
+
+    for statement in REFRESH_STATEMENTS:
+        try:
+            refreshed.append(refresh_batch(session, statement, READ_MODEL_REFRESH_BATCH_SIZE))
+        except DBAPIError:
+            # e.g. a serialization failure, retrying the whole batch could fail again and again.
+            session.rollback()
+            refreshed.append(refresh_row_by_row(session, statement))
+
+    return max(refreshed)
+
+# in its own transaction, the workers all write the same row.
+def beat(session) -> None:
+    session.execute(text("UPDATE read_model_heartbeat SET beat_at = now()"))
+    session.commit()
+
+# started by the lifespan of main.py, runs until it is cancelled.
+async def maintain_read_models() -> None:
+    while True:
+        try:
+            refreshed = await run_in_session(refresh_stale)
+            await run_in_session(beat)
+        except Exception:
+            # e.g. the database is not reachable, the rows stay stale and are tried again.
+            refreshed = 0
+
+        # a full batch means there is more, e.g. right after migration 7.
+        if refreshed < READ_MODEL_REFRESH_BATCH_SIZE:
+            await asyncio.sleep(READ_MODEL_REFRESH_INTERVAL)
@@ -0,0 +1,184 @@
+# app/router.py
+
+import asyncio
+import json
+import time
+
+from fastapi import Response
+from graphql import GraphQLError
+from strawberry import UNSET
+from strawberry.exceptions import MissingQueryError
+from strawberry.http.exceptions import HTTPException
+from strawberry.types.graphql import OperationType
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.types import ExecutionResult
+from app.persisted_queries import PersistedQueryError, resolve_query, is_mutation
+from app.loaders import get_loaders
+from app.config import GRAPHQL_MAX_BATCH_SIZE, QUERY_COST_BUDGET
+from app.cost import query_cost
+from app.tracing import phase_duration
+from app.http_cache import CACHE_CONTROL, etag_matches, read_catalog_version, request_etag
+from app.database.session import run_in_session
+from app.database.replicas import remember_write
+
+
+"""
+TODO: Define all router BELOW!
+"""
+class FilmsGraphQLRouter(GraphQLRouter):
+    """GraphQLRouter that understands persisted queries, conditional GETs and batches.
+
+    The query text of a request can be replaced by the hash of a query the
+    client sent before, or of a query from the allowlist manifest. Queries
+    sent with GET get an ETag, see app/http_cache.py. A POST can carry an
+    array of operations that run concurrently.
+    """
+
+    # a GET with only a persisted query hash is an operation, not a visit of GraphiQL.
+    def should_render_graphiql(self, request) -> bool:
+        return super().should_render_graphiql(request) and request.query_params.get("extensions") is None
+
+    async def run(self, request, context=UNSET, root_value=UNSET):
+        if request.method == "GET" and not self.should_render_graphiql(self.request_adapter_class(request)):
+            return await self.run_get(request, context, root_value)
+
+        if request.method == "POST" and (await request.body()).lstrip()[:1] == b"[":
+            response = await self.run_batch(request, context, root_value)
+        else:
+            response = await super().run(request, context=context, root_value=root_value)
+
+        # the next queries of this client read from the primary (see app/database/replicas.py).
+        if getattr(request.state, "wrote", False):
+            remember_write(response)
+
+        return response
+
+    async def run_get(self, request, context, root_value):
+        # read before executing, so a write during the execution only makes the ETag older than the data.
+        version = await run_in_session(read_catalog_version)
+        # the caches of this worker key what they serve to this request by it (see app/cache.py).
+        request.state.catalog_version = version
+        headers = {"ETag": request_etag(version, dict(request.query_params)), "Cache-Control": CACHE_CONTROL}
+
+        if etag_matches(request.headers.get("If-None-Match", ""), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        response = await super().run(request, context=context, root_value=root_value)
+
+        # errors can be temporary (e.g. a pool timeout), they are never cached.
+        if getattr(request.state, "cacheable", False):
+            response.headers.update(headers)
+
+        return response
+
+    # an array of operations in one POST, answered with an array of results in the same order.
+    async def run_batch(self, request, context, root_value):
+        operations = self.parse_json(await request.body())
+
+        if not operations or len(operations) > GRAPHQL_MAX_BATCH_SIZE:
+            raise HTTPException(400, f"A batch must have between 1 and {GRAPHQL_MAX_BATCH_SIZE} operations.")
+
+        if not all(isinstance(operation, dict) for operation in operations):
+            raise HTTPException(400, "Every operation of a batch must be an object.")
+
+        sub_response = await self.get_sub_response(request)
+        cost = sum(self.batched_cost(operation) for operation in operations)
+
+        if cost > QUERY_COST_BUDGET:
+            # QueryCost checks every operation on its own, a batch of N would get N budgets.
+            error = GraphQLError(
+                f"Batch cost {cost} exceeds the budget of {QUERY_COST_BUDGET}.", extensions={"code": "QUERY_TOO_EXPENSIVE"}
+                )
+            results = [
+                await self.process_result(request=request, result=ExecutionResult(data=None, errors=[error]))
+                for _ in operations
+                ]
+
+            return self.create_response(response_data=results, sub_response=sub_response)
+
+        if any(is_mutation(operation) for operation in operations):
+            # in order, and with fresh DataLoaders, so every operation sees what the ones before it wrote.
+            results = [
+                await self.execute_batched(request, operation, {**context, **get_loaders()}, root_value)
+                for operation in operations
+                ]
+        else:
+            # queries only read, so they share the DataLoaders of the request.
+            results = await asyncio.gather(
+                *(self.execute_batched(request, operation, context, root_value) for operation in operations)
+                )
+
+        return self.create_response(response_data=results, sub_response=sub_response)
+
+    # operations that fail to resolve or validate cost nothing, their execution reports the error.
+    def batched_cost(self, operation: dict) -> int:
+        try:
+            query = resolve_query(operation.get("query"), operation.get("extensions"))
+        except PersistedQueryError:
+            return 0
+
+        variables = operation.get("variables")
+        cost = query_cost(
+            self.schema._schema, query, operation.get("operationName"), variables if isinstance(variables, dict) else None
+            )
+
+        return cost or 0
+
+    async def execute_batched(self, request, operation: dict, context, root_value) -> dict:
+        try:
+            result = await self.schema.execute(
+                resolve_query(operation.get("query"), operation.get("extensions")),
+                root_value=root_value,
+                variable_values=operation.get("variables"),
+                context_value=context,
+                operation_name=operation.get("operationName"),
+                allowed_operation_types=OperationType.from_http("POST"),
+                )
+        except PersistedQueryError as error:
+            result = ExecutionResult(data=None, errors=[GraphQLError(error.message, extensions={"code": error.code})])
+        except MissingQueryError:
+            result = ExecutionResult(data=None, errors=[GraphQLError("No GraphQL query found in the operation.")])
+
+        return await self.process_result(request=request, result=result)
+
+    async def process_result(self, request, result):
+        request.state.cacheable = request.method == "GET" and not result.errors
+
+        return await super().process_result(request=request, result=result)
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        content_type = request.content_type or ""
+
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+            extensions = data.get("extensions")
+        elif request.method == "GET":
+            data = self.parse_query_params(request.query_params)
+            extensions = json.loads(data["extensions"]) if data.get("extensions") else None
+        else:
+            return await super().parse_http_body(request)
+
+        return GraphQLRequestData(
+            query=resolve_query(data.get("query"), extensions),
+            variables=data.get("variables"),
+            operation_name=data.get("operationName"),
+            )
+
+    async def execute_operation(self, request, context, root_value) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request=request, context=context, root_value=root_value)
+        except PersistedQueryError as error:
+            # clients look at the code, e.g. to send the full query after PERSISTED_QUERY_NOT_FOUND.
+            return ExecutionResult(
+                data=None,
+                errors=[GraphQLError(error.message, extensions={"code": error.code})]
+                )
+
+    # the last phase of a request, after the extensions are done.
+    def encode_json(self, response_data) -> str:
+        started = time.perf_counter()
+        data = super().encode_json(response_data)
+        phase_duration.observe("serialize", time.perf_counter() - started)
+
+        return data
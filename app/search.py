@@ -0,0 +1,85 @@
+# app/search.py
+
+import re
+
+from sqlalchemy import Float, select, func, and_, or_, cast, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.pagination import MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from app.types import (
+    Connection as connection,
+    Edge as edge,
+    PageInfo as page_info,
+    )
+from app.projection import map_rows
+from typing import Any, Optional
+
+
+# turn free text into a prefix tsquery, "star wa" becomes "star:* & wa:*".
+def prefix_tsquery(text: str) -> str:
+    words = re.findall(r"\w+", text.lower())
+
+    if not words:
+        raise Exception("Search text must contain at least one word.")
+
+    return " & ".join(f"{word}:*" for word in words)
+
+# returns the statement of one page, with one extra row, and the condition of the matches (for totalCount).
+def search_statement(model, columns: list, text_column, text: str, first: int, after: Optional[str] = None) -> tuple:
+    # generated column from migration 4, it is not mapped so it never gets loaded.
+    search_vector = literal_column(f"{model.__tablename__}.search_vector", TSVECTOR)
+    ts_query = func.to_tsquery("simple", prefix_tsquery(text))
+    # ts_rank and similarity are float4, the cursor brings the rank back as float8,
+    # so it is float8 everywhere or the tiebreak of equal ranks never matches.
+    rank = cast(func.ts_rank(search_vector, ts_query) + func.similarity(text_column, text), Float(53))
+
+    # both conditions are served by GIN indexes, "%" is the pg_trgm similarity operator.
+    matches = or_(
+        search_vector.bool_op("@@")(ts_query),
+        text_column.bool_op("%")(text),
+        )
+    statement = select(*dict.fromkeys([*columns, model.uuid]), rank.label("rank")).where(matches)
+
+    if after is not None:
+        after_rank, after_uuid = decode_cursor(after, "rank", rank)
+        statement = statement.where(or_(
+            rank < after_rank,
+            and_(rank == after_rank, model.uuid > after_uuid),
+            ))
+
+    return statement.order_by(rank.desc(), model.uuid).limit(first + 1), matches
+
+# only `columns` are selected, the nodes are built from the partial rows.
+# rank rows by full-text match (search_vector column) plus trigram similarity of `text_column`.
+def search(
+    session,
+    model,
+    columns: list,
+    text_column,
+    text: str,
+    node_type: Any,
+    first: int = 10,
+    after: Optional[str] = None,
+    ) -> connection:
+    if not 0 < first <= MAX_PAGE_SIZE:
+        raise Exception(f"Page size must be between 1 and {MAX_PAGE_SIZE}.")
+
+    statement, matches = search_statement(model, columns, text_column, text, first, after)
+    rows = session.execute(statement).all()
+    has_more = len(rows) > first
+    rows = rows[:first]
+
+    edges = [edge(
+        node=node,
+        cursor=encode_cursor("rank", row.rank, row.uuid)
+    ) for node, row in zip(map_rows(node_type, rows), rows)]
+
+    return connection(
+        edges=edges,
+        page_info=page_info(
+            has_next_page=has_more,
+            has_previous_page=after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+        count_statement=select(func.count()).select_from(model).where(matches),
+    )
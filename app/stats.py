@@ -0,0 +1,124 @@
+# app/stats.py
+
+import strawberry
+
+from app.models import (
+    Film as film_model,
+    Actor as actor_model,
+    FilmActor as film_actor_model,
+    )
+from app.types import (
+    ActorTypeBase as actor_type_base,
+    KeyCount as key_count,
+    YearCount as year_count,
+    ActorFilmCount as actor_film_count,
+    )
+from strawberry.types import Info as type_info
+from app import cache
+from app.projection import map_rows
+from app.database.session import run_in_session
+from sqlalchemy import select, func, cast, Integer, Float
+from typing import Any, Callable, List
+
+
+"""
+TODO: Define all stats helper BELOW!
+"""
+# read through the stats cache, which every mutation clears (see app/cache.py).
+async def cached(info: type_info, key: str, fetch: Callable[..., Any]) -> Any:
+    key = cache.versioned_key(key, info.context.get("request"))
+    value = cache.stats_cache.get(key)
+
+    if value is cache.MISSING:
+        generation = cache.stats_generation
+        value = await run_in_session(fetch)
+
+        if generation == cache.stats_generation:
+            cache.stats_cache.set(key, value)
+
+    return value
+
+def films_per(column) -> Callable[..., list]:
+    def fetch(session) -> list:
+        count = func.count().label("count")
+        rows = session.execute(
+            select(column.label("key"), count).group_by(column).order_by(count.desc(), column)
+            ).all()
+
+        return map_rows(key_count, rows)
+
+    return fetch
+
+"""
+TODO: Define main Stats class BELOW!
+"""
+@strawberry.type(
+    description="""Aggregates over the whole catalog, computed with GROUP BY in the database.\n\
+    NOTE: every aggregate is cached for STATS_CACHE_TTL seconds and dropped by every mutation."""
+    )
+class Stats:
+    @strawberry.field(
+        description="Amount of films per genre, the most common genre first"
+        )
+    async def films_per_genre(self, info: type_info) -> List[key_count]:
+        return await cached(info, "films_per_genre", films_per(film_model.genre))
+
+    @strawberry.field(
+        description="Amount of films per language, the most common language first"
+        )
+    async def films_per_language(self, info: type_info) -> List[key_count]:
+        return await cached(info, "films_per_language", films_per(film_model.language))
+
+    @strawberry.field(
+        description="Amount of films per release year, the oldest year first"
+        )
+    async def films_per_release_year(self, info: type_info) -> List[year_count]:
+        def fetch(session) -> List[year_count]:
+            year = cast(func.extract("year", film_model.release), Integer).label("year")
+            rows = session.execute(
+                select(year, func.count().label("count")).group_by(year).order_by(year)
+                ).all()
+
+            return map_rows(year_count, rows)
+
+        return await cached(info, "films_per_release_year", fetch)
+
+    @strawberry.field(
+        description="The actors who play in the most films, the most films first"
+        )
+    async def top_actors(self, info: type_info, limit: int = 10) -> List[actor_film_count]:
+        def fetch(session) -> List[actor_film_count]:
+            # counted on the actor_id index alone, only the winners are joined with actors.
+            counts = (
+                select(film_actor_model.actor_id, func.count().label("film_count"))
+                .group_by(film_actor_model.actor_id)
+                .order_by(func.count().desc(), film_actor_model.actor_id)
+                .limit(limit)
+                .subquery()
+                )
+            rows = session.execute(
+                select(*actor_model.__table__.columns, counts.c.film_count)
+                .join(counts, counts.c.actor_id == actor_model.uuid)
+                .order_by(counts.c.film_count.desc(), actor_model.uuid)
+                ).all()
+
+            return [
+                actor_film_count(actor=actor, film_count=row.film_count)
+                for actor, row in zip(map_rows(actor_type_base, rows), rows)
+                ]
+
+        return await cached(info, f"top_actors:{limit}", fetch)
+
+    @strawberry.field(
+        description="Average amount of actors per film, films without actors count as 0"
+        )
+    async def average_cast_size(self, info: type_info) -> float:
+        def fetch(session) -> float:
+            links = select(func.count()).select_from(film_actor_model).scalar_subquery()
+            films = select(func.count()).select_from(film_model).scalar_subquery()
+
+            return session.execute(
+                select(func.coalesce(cast(links, Float) / func.nullif(films, 0), 0.0))
+                ).scalar_one()
+
+        return await cached(info, "average_cast_size", fetch)
@@ -0,0 +1,91 @@
+# app/subscription.py
+
+import strawberry
+
+from strawberry.types import Info as type_info
+from app.types import (
+    FilmTypeBase as film_type_base,
+    ActorTypeBase as actor_type_base,
+    FilmActorTypeBase as film_actor_type_base,
+    ChangeOperation as change_operation,
+    FilmChange as film_change,
+    ActorChange as actor_change,
+    CastChange as cast_change,
+    )
+from app.notifications import change_hub
+from app.projection import map_dict
+from app.loaders import get_loaders
+from typing import AsyncGenerator, Optional
+
+
+"""
+TODO: Define main Subscription class BELOW!
+"""
+# define Subscription main schema
+@strawberry.type(
+    description="""Is a command to get every change of the data pushed over a websocket, \
+    instead of fetching it again and again.\nNOTE: a client that falls behind or misses changes \
+    gets an error and has to fetch the data again before it subscribes again."""
+    )
+class Subscription:
+    @strawberry.subscription(
+        description="Useful for following the changes of all films, or of one film with filmId"
+        )
+    async def film_changed(
+        self,
+        info: type_info,
+        film_id: Optional[str] = None,
+        ) -> AsyncGenerator[film_change, None]:
+        async for change in change_hub.changes("films"):
+            if film_id is not None and change["row"]["uuid"] != film_id:
+                continue
+
+            film = map_dict(film_type_base, change["row"])
+            # fresh DataLoaders per event, the context is shared by every subscription of the websocket.
+            film.loaders = get_loaders()
+
+            yield film_change(
+                operation=change_operation(change["operation"]),
+                film=film
+            )
+
+    @strawberry.subscription(
+        description="Useful for following the changes of all actors, or of one actor with actorId"
+        )
+    async def actor_changed(
+        self,
+        info: type_info,
+        actor_id: Optional[str] = None,
+        ) -> AsyncGenerator[actor_change, None]:
+        async for change in change_hub.changes("actors"):
+            if actor_id is not None and change["row"]["uuid"] != actor_id:
+                continue
+
+            actor = map_dict(actor_type_base, change["row"])
+            actor.loaders = get_loaders()
+
+            yield actor_change(
+                operation=change_operation(change["operation"]),
+                actor=actor
+            )
+
+    @strawberry.subscription(
+        description="""Useful for following who plays in which film, \
+        filmId and actorId narrow it down to the connections of one film or one actor"""
+        )
+    async def cast_changed(
+        self,
+        info: type_info,
+        film_id: Optional[str] = None,
+        actor_id: Optional[str] = None,
+        ) -> AsyncGenerator[cast_change, None]:
+        async for change in change_hub.changes("filmactors"):
+            row = change["row"]
+
+            if (film_id is not None and row["film_id"] != film_id) or (actor_id is not None and row["actor_id"] != actor_id):
+                continue
+
+            yield cast_change(
+                operation=change_operation(change["operation"]),
+                film_actor=map_dict(film_actor_type_base, row)
+            )
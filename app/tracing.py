@@ -0,0 +1,183 @@
+# app/tracing.py
+
+"""Latency histograms of the GraphQL phases, the resolvers and the SQL.
+
+The Tracing extension times parsing, validation, execution and every
+async resolver, the engine events time every SQL statement. Everything
+ends up in Prometheus histograms on /metrics, and with
+TRACING_IN_RESPONSE=true each response also gets its own breakdown
+under extensions.timing.
+"""
+
+import contextvars
+import inspect
+import threading
+import time
+
+from collections import defaultdict
+from sqlalchemy import event
+from strawberry.extensions import SchemaExtension
+from app.config import TRACING_IN_RESPONSE
+from typing import Optional
+
+
+# upper bounds in seconds, from a cached lookup up to a slow export.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+"""
+TODO: Define all histogram BELOW!
+"""
+class Histogram:
+    def __init__(self, name: str, label: str, buckets: tuple = BUCKETS) -> None:
+        self.name = name
+        self.label = label
+        self.buckets = buckets
+        # label value -> [count per bucket..., +Inf count, sum]
+        self._series = {}
+        # resolvers of sync mode finish in worker threads.
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get(label_value)
+
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[index] += 1
+
+            series[-2] += 1
+            series[-1] += seconds
+
+    # lines in the Prometheus text exposition format.
+    def render(self) -> list:
+        lines = [f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                label = f'{self.label}="{label_value}"'
+
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count}')
+
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series[-2]}')
+                lines.append(f"{self.name}_sum{{{label}}} {series[-1]}")
+                lines.append(f"{self.name}_count{{{label}}} {series[-2]}")
+
+        return lines
+
+phase_duration = Histogram("films_api_graphql_phase_duration_seconds", "phase")
+resolver_duration = Histogram("films_api_resolver_duration_seconds", "field")
+sql_duration = Histogram("films_api_sql_duration_seconds", "statement")
+
+HISTOGRAMS = (phase_duration, resolver_duration, sql_duration)
+
+"""
+TODO: Define all request trace BELOW!
+"""
+# timings of one GraphQL operation, shared with the worker threads through the context.
+class Trace:
+    def __init__(self) -> None:
+        self.phases = {}
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.resolvers = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+
+    def add_sql(self, seconds: float) -> None:
+        with self._lock:
+            self.sql_count += 1
+            self.sql_seconds += seconds
+
+    def add_resolver(self, field: str, seconds: float) -> None:
+        with self._lock:
+            self.resolvers[field][0] += 1
+            self.resolvers[field][1] += seconds
+
+    def as_dict(self) -> dict:
+        return {
+            **{phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+            "sql": {"count": self.sql_count, "seconds": round(self.sql_seconds, 6)},
+            "resolvers": {
+                field: {"count": count, "seconds": round(seconds, 6)}
+                for field, (count, seconds) in self.resolvers.items()
+                },
+        }
+
+current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+"""
+TODO: Define all SQL instrumentation BELOW!
+"""
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    seconds = time.perf_counter() - conn.info["query_started"].pop()
+    sql_duration.observe(statement.lstrip().split(None, 1)[0].upper(), seconds)
+
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add_sql(seconds)
+
+# time every statement of an engine, for an async engine pass its sync_engine.
+def instrument_engine(engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+"""
+TODO: Define all schema extension BELOW!
+"""
+class Tracing(SchemaExtension):
+    """Record the phases and async resolvers of every operation."""
+
+    def on_operation(self):
+        self.trace = Trace()
+        token = current_trace.set(self.trace)
+
+        try:
+            yield
+        finally:
+            current_trace.reset(token)
+
+    def _phase(self, phase: str):
+        started = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - started
+
+        self.trace.phases[phase] = seconds
+        phase_duration.observe(phase, seconds)
+
+    def on_parse(self):
+        yield from self._phase("parse")
+
+    def on_validate(self):
+        yield from self._phase("validate")
+
+    def on_execute(self):
+        yield from self._phase("execute")
+
+    # only the async resolvers are timed, the others just read an attribute.
+    def resolve(self, _next, root, info, *args, **kwargs):
+        result = _next(root, info, *args, **kwargs)
+
+        if not inspect.isawaitable(result):
+            return result
+
+        return self._timed(result, f"{info.parent_type.name}.{info.field_name}")
+
+    async def _timed(self, result, field: str):
+        started = time.perf_counter()
+
+        try:
+            return await result
+        finally:
+            seconds = time.perf_counter() - started
+            resolver_duration.observe(field, seconds)
+            self.trace.add_resolver(field, seconds)
+
+    def get_results(self) -> dict:
+        return {"timing": self.trace.as_dict()} if TRACING_IN_RESPONSE else {}
@@ -1,5 +1,6 @@
 # app/types.py
 
+import enum
 import strawberry
 
 from app.schemas import (
@@ -11,12 +12,29 @@ from app.schemas import (
     ActorUpdateSchema as actor_update_schema,
     FilmActorSchema as film_actor_schema,
     )
-from typing import Any
+from strawberry.types import Info as type_info
+from app.database.session import run_in_session
+from typing import Any, List, Annotated, Optional, Generic, TypeVar
 
 
 """
 NOTE: Define model base type.
 """
+# the DataLoaders of the request, or the ones a subscription event carries on its node (see app/subscription.py).
+async def load_related(node, info: type_info, loader: str) -> list:
+    loaders = getattr(node, "loaders", None)
+
+    if loaders is None:
+        return await info.context[loader].load(node.uuid)
+
+    related = await loaders[loader].load(node.uuid)
+
+    # nested fields of the event keep using its loaders.
+    for item in related:
+        item.loaders = loaders
+
+    return related
+
 # define FilmTypeBase basic schema
 @strawberry.experimental.pydantic.type(
     model=film_base,
@@ -25,7 +43,12 @@ NOTE: Define model base type.
     all_fields=True
     )
 class FilmTypeBase:
-    pass
+    @strawberry.field(
+        description="""Actors who play in this film. \
+        Resolved in batches, so a whole page of films only costs one extra query."""
+        )
+    async def actors(self, info: type_info) -> List[Annotated["ActorTypeBase", strawberry.lazy("app.types")]]:
+        return await load_related(self, info, "actors_by_film_loader")
 
 # define ActorTypeBase basic schema
 @strawberry.experimental.pydantic.type(
@@ -35,7 +58,12 @@ class FilmTypeBase:
     all_fields=True
     )
 class ActorTypeBase:
-    pass
+    @strawberry.field(
+        description="""Films in which this actor plays. \
+        Resolved in batches, so a whole page of actors only costs one extra query."""
+        )
+    async def films(self, info: type_info) -> List[FilmTypeBase]:
+        return await load_related(self, info, "films_by_actor_loader")
 
 """
 TODO: DEFINE ALL FILM TYPE BELOW!
@@ -141,3 +169,169 @@ class FilmActorResponse:
     film_actor: FilmActorTypeBase
     response: Response
 
+@strawberry.type(
+    description="""Describes why one item of a bulk mutation was skipped, \
+    the other items are still written."""
+    )
+class BulkItemError:
+    index: int = strawberry.field(
+        description="Position of the item in the input list"
+        )
+    message: str = strawberry.field(
+        description="Why the item was skipped"
+        )
+
+@strawberry.type(
+    description="""Is a combination between the created films, the skipped items and response data."""
+    )
+class FilmBulkCreateResponse:
+    films: List[FilmTypeBase]
+    errors: List[BulkItemError]
+    response: Response
+
+@strawberry.type(
+    description="""Is a combination between the created actors, the skipped items and response data."""
+    )
+class ActorBulkCreateResponse:
+    actors: List[ActorTypeBase]
+    errors: List[BulkItemError]
+    response: Response
+
+@strawberry.type(
+    description="""Is a combination between the created film actors, the skipped items and response data."""
+    )
+class FilmActorBulkResponse:
+    film_actors: List[FilmActorTypeBase]
+    errors: List[BulkItemError]
+    response: Response
+
+@strawberry.type(
+    description="""Is a combination between the deleted rows, the connections deleted with them and response data."""
+    )
+class DeleteManyResponse:
+    ids: List[str] = strawberry.field(
+        description="UUIDs of the deleted rows"
+        )
+    deleted_count: int = strawberry.field(
+        description="Number of deleted rows"
+        )
+    cascaded_count: int = strawberry.field(
+        description="Number of Film Actor connections the database deleted with them (ON DELETE CASCADE)"
+        )
+    response: Response
+
+"""
+TODO: DEFINE ALL PAGINATION TYPE BELOW!
+"""
+NodeType = TypeVar("NodeType")
+
+@strawberry.enum(
+    description="Columns that films can be paginated by, the UUID is always used as a tiebreaker."
+    )
+class FilmSortKey(enum.Enum):
+    TIMESTAMP = "timestamp"
+    TITLE = "title"
+    UUID = "uuid"
+
+@strawberry.enum(
+    description="Columns that actors can be paginated by, the UUID is always used as a tiebreaker."
+    )
+class ActorSortKey(enum.Enum):
+    TIMESTAMP = "timestamp"
+    NAME = "name"
+    UUID = "uuid"
+
+@strawberry.enum(
+    description="Columns that film actors can be paginated by, the UUID is always used as a tiebreaker."
+    )
+class FilmActorSortKey(enum.Enum):
+    TIMESTAMP = "timestamp"
+    UUID = "uuid"
+
+@strawberry.type(
+    description="Information about the current page of a connection."
+    )
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str]
+    end_cursor: Optional[str]
+
+@strawberry.type(
+    description="One item of a connection together with its opaque cursor."
+    )
+class Edge(Generic[NodeType]):
+    node: NodeType
+    cursor: str
+
+@strawberry.type(
+    description="""Is a Relay style page of data. \
+    Use the endCursor as the after argument to get the next page."""
+    )
+class Connection(Generic[NodeType]):
+    edges: List[Edge[NodeType]]
+    page_info: PageInfo
+    count_statement: strawberry.Private[Any]
+
+    @strawberry.field(
+        description="Total amount of data, only counted when this field is requested."
+        )
+    async def total_count(self) -> int:
+        return await run_in_session(lambda session: session.scalar(self.count_statement))
+
+"""
+TODO: DEFINE ALL SUBSCRIPTION TYPE BELOW!
+"""
+@strawberry.enum(
+    description="The SQL statement that changed a row."
+    )
+class ChangeOperation(enum.Enum):
+    INSERT = "INSERT"
+    UPDATE = "UPDATE"
+    DELETE = "DELETE"
+
+@strawberry.type(
+    description="""A committed change of one film, a deleted film is sent as it was before."""
+    )
+class FilmChange:
+    operation: ChangeOperation
+    film: FilmTypeBase
+
+@strawberry.type(
+    description="""A committed change of one actor, a deleted actor is sent as it was before.\n\
+    NOTE: the biography is null when it was too long for a notification, get it with getActor."""
+    )
+class ActorChange:
+    operation: ChangeOperation
+    actor: ActorTypeBase
+
+@strawberry.type(
+    description="""A committed change of one connection between a Film and an Actor."""
+    )
+class CastChange:
+    operation: ChangeOperation
+    film_actor: FilmActorTypeBase
+
+"""
+TODO: DEFINE ALL STATS TYPE BELOW!
+"""
+@strawberry.type(
+    description="How many films have the same value in one column."
+    )
+class KeyCount:
+    key: Optional[str]
+    count: int
+
+@strawberry.type(
+    description="How many films were released in one year, the year is null for films without a release date."
+    )
+class YearCount:
+    year: Optional[int]
+    count: int
+
+@strawberry.type(
+    description="An actor together with the amount of films the actor plays in."
+    )
+class ActorFilmCount:
+    actor: ActorTypeBase
+    film_count: int
@@ -0,0 +1,79 @@
+# benchmarks/database_mode.py
+
+"""Compare requests/sec of the sync and async DATABASE_MODE.
+
+Every mode runs in its own process, because the mode is read once when
+app.config is imported. Needs a reachable database with some films in it:
+
+    python -m benchmarks.database_mode --concurrency 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import rich
+
+
+QUERY = "{ getFilms(limit: 20) { uuid title genre } }"
+
+
+# run the GraphQL query with `concurrency` clients for `duration` seconds.
+async def measure(concurrency: int, duration: float) -> float:
+    import strawberry
+
+    from app.query import Query as app_query
+    from app.mutation import Mutation as app_mutation
+    from app.loaders import get_loaders
+
+    schema = strawberry.Schema(query=app_query, mutation=app_mutation)
+    deadline = time.perf_counter() + duration
+    completed = 0
+
+    async def client() -> None:
+        nonlocal completed
+
+        while time.perf_counter() < deadline:
+            result = await schema.execute(QUERY, context_value=get_loaders())
+
+            if result.errors:
+                raise result.errors[0]
+
+            completed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    return completed / (time.perf_counter() - started)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mode", choices=("sync", "async"), help="run a single mode in this process")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(asyncio.run(measure(args.concurrency, args.duration)))
+        return
+
+    results = {}
+    for mode in ("sync", "async"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.database_mode", "--mode", mode,
+             "--concurrency", str(args.concurrency), "--duration", str(args.duration)],
+            env={**os.environ, "DATABASE_MODE": mode},
+            capture_output=True,
+            text=True,
+            check=True,
+            )
+        results[mode] = float(output.stdout.strip().splitlines()[-1])
+        rich.print(f"[bold green]{mode}[/bold green]: [bold yellow]{results[mode]:.1f}[/bold yellow] requests/sec")
+
+    rich.print(f"async / sync: [bold yellow]{results['async'] / results['sync']:.2f}x[/bold yellow]")
+
+if __name__ == "__main__":
+    main()
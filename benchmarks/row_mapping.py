@@ -0,0 +1,76 @@
+# benchmarks/row_mapping.py
+
+"""Objects/sec of building FilmTypeBase objects for a 1000 row page.
+
+"before" loads ORM rows and calls the type's __init__ for every field,
+like the resolvers used to. "after" selects Core rows and builds the
+objects with app.projection.map_rows. Runs on an in-memory SQLite
+database, so it only measures Python work:
+
+    python -m benchmarks.row_mapping --rows 1000
+"""
+
+import argparse
+import os
+import timeit
+
+# app.config needs these, the benchmark brings its own engine.
+os.environ.setdefault("POSTGRES_DATABASE_URI", "sqlite://")
+os.environ.setdefault("APP_DEV_PORT", "8000")
+
+import rich
+
+from datetime import date, datetime
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.models import Film as film_model
+from app.types import FilmTypeBase as film_type_base
+from app.projection import map_rows
+
+
+def build_before(session) -> list:
+    return [film_type_base(
+        uuid=film.uuid,
+        title=film.title,
+        genre=film.genre,
+        language=film.language,
+        release=film.release,
+        is_premiere=film.is_premiere,
+        timestamp=film.timestamp,
+    ) for film in session.query(film_model).all()]
+
+def build_after(session) -> list:
+    return map_rows(film_type_base, session.execute(select(*film_model.__table__.columns)).all())
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    # only the films table, the read model tables are JSONB and Postgres only.
+    film_model.__table__.create(engine)
+
+    with Session(engine) as session:
+        session.add_all(film_model(
+            uuid=f"{index:032x}",
+            title=f"Film {index}",
+            genre="Drama",
+            language="English",
+            release=date(2011, 1, 1),
+            is_premiere=False,
+            timestamp=datetime(2020, 1, 1),
+        ) for index in range(args.rows))
+        session.commit()
+
+        assert build_before(session) == build_after(session)
+
+        for name, build in (("before", build_before), ("after", build_after)):
+            # expunge, so the ORM path pays for loading the rows every time.
+            seconds = min(timeit.repeat(lambda: (build(session), session.expunge_all()), number=args.repeat, repeat=3))
+            rich.print(f"[bold green]{name}[/bold green]: [bold yellow]{args.rows * args.repeat / seconds:,.0f}[/bold yellow] objects/sec")
+
+if __name__ == "__main__":
+    main()
@@ -5,39 +5,152 @@
 import strawberry
 import uvicorn
 import os
+import sys
+import contextlib
+import asyncio
 
-from strawberry.fastapi import GraphQLRouter
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from app.query import Query as app_query
 from app.mutation import Mutation as app_mutation
-from app.database.sql_tool import query
-from app.database.query import (
-    create_films_table_query, 
-    create_actors_table_query,
-    create_film_actors_table_query
+from app.subscription import Subscription as app_subscription
+from app.loaders import get_loaders
+from app.router import FilmsGraphQLRouter
+from app.persisted_queries import DocumentCache, load_allowlist
+from app.cost import QueryCost
+from app.tracing import Tracing, instrument_engine
+from app.metrics import render_metrics
+from app.notifications import change_hub
+from app.read_model import maintain_read_models
+from app.database.exporter import EXPORTS, MEDIA_TYPES, export_lines
+from app.database.replicas import (
+    ReplicaRouting,
+    get_replica_engines,
+    monitor_replicas,
+    reset_replicas,
+    dispose_replicas,
     )
 from app.config import (
+    get_engine,
+    get_async_engine,
+    reset_engines,
+    dispose_engines,
     APP_DEV_HOST, 
-    APP_DEV_PORT
+    APP_DEV_PORT,
+    APP_HOST,
+    APP_PORT,
+    APP_WORKERS,
+    APP_LOOP,
+    APP_HTTP,
+    APP_KEEP_ALIVE,
+    APP_BACKLOG,
+    APP_LIMIT_CONCURRENCY,
+    APP_GRACEFUL_TIMEOUT,
+    PERSISTED_QUERIES_ALLOWLIST,
+    READ_MODEL_ENABLED
     )
 
 
+# every request gets fresh DataLoaders.
+async def get_context() -> dict:
+    return get_loaders()
+
 # define requirement for graphql
 graphql_schema = strawberry.Schema(
     query=app_query, 
-    mutation=app_mutation
+    mutation=app_mutation,
+    subscription=app_subscription,
+    extensions=[Tracing, DocumentCache, QueryCost, ReplicaRouting]
     )
-graphql_router = GraphQLRouter(
+graphql_router = FilmsGraphQLRouter(
     schema=graphql_schema, 
+    context_getter=get_context,
     debug=True, 
     graphiql=True
     )
     
+# everything that touches the database or the disk runs here, not at import time.
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # a preloading parent may have used the engines before it forked this worker.
+    reset_engines()
+    reset_replicas()
+
+    # time every SQL statement for the histograms on /metrics.
+    instrument_engine(get_engine())
+
+    if get_async_engine() is not None:
+        instrument_engine(get_async_engine().sync_engine)
+
+    for replica_engine in get_replica_engines():
+        instrument_engine(getattr(replica_engine, "sync_engine", replica_engine))
+
+    replica_monitor = asyncio.create_task(monitor_replicas()) if get_replica_engines() else None
+    read_model_refresher = asyncio.create_task(maintain_read_models()) if READ_MODEL_ENABLED else None
+
+    # in allowlist mode only the operations of the manifest are executed, all of them already validated.
+    if PERSISTED_QUERIES_ALLOWLIST:
+        load_allowlist(PERSISTED_QUERIES_ALLOWLIST, graphql_schema)
+
+    yield
+
+    # the server stopped accepting requests and the ones in flight are done.
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+
+    if read_model_refresher is not None:
+        read_model_refresher.cancel()
+
+    # started by the first subscription, see app/notifications.py.
+    await change_hub.stop()
+
+    await dispose_engines()
+    await dispose_replicas()
+
 # define the app.
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(router=graphql_router, prefix="/graphql")
 
-# run the program.
+# connection pool, cache and latency metrics for Prometheus.
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> str:
+    return render_metrics()
+
+# download films, actors or the cast as a stream, memory stays flat for any table size.
+@app.get("/export/{kind}")
+def export(kind: str, format: str = "jsonl") -> StreamingResponse:
+    if kind not in EXPORTS or format not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Unknown export '{kind}.{format}', use one of {list(EXPORTS)} as {list(MEDIA_TYPES)}."
+            )
+
+    return StreamingResponse(
+        export_lines(kind, format), 
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'}
+        )
+
+# several workers on uvloop and httptools, every worker imports this module on its own.
+def run_production() -> None:
+    uvicorn.run(
+        "main:app",
+        host=APP_HOST,
+        port=APP_PORT,
+        workers=APP_WORKERS,
+        loop=APP_LOOP,
+        http=APP_HTTP,
+        timeout_keep_alive=APP_KEEP_ALIVE,
+        backlog=APP_BACKLOG,
+        limit_concurrency=APP_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=APP_GRACEFUL_TIMEOUT,
+        access_log=False
+        )
+
+# run the program, `python main.py --production` for the production server.
 if __name__ == "__main__":
-    uvicorn.run("__main__:app", host=APP_DEV_HOST, port=APP_DEV_PORT, use_colors=True, reload=True)
+    if "--production" in sys.argv:
+        run_production()
+    else:
+        uvicorn.run("__main__:app", host=APP_DEV_HOST, port=APP_DEV_PORT, use_colors=True, reload=True)
     
\ No newline at end of file